@@ -1,6 +1,7 @@
 from django_filters import ModelMultipleChoiceFilter
 from django_filters.rest_framework import CharFilter, FilterSet, filters
 
+from core.search import trigram_search
 from recipes.models import Ingredient, Recipe, Tag
 from users.models import User
 
@@ -12,10 +13,15 @@ class IngredientFilterSet(FilterSet):
         field_name='name',
         lookup_expr='icontains',
     )
+    search = CharFilter(method='get_search')
+
+    def get_search(self, queryset, name, value):
+        """Поиск с опечатками, лучшие совпадения первыми."""
+        return trigram_search(queryset, 'name', value)
 
     class Meta:
         model = Ingredient
-        fields = ('name',)
+        fields = ('name', 'search')
 
 
 class RecipeFilterSet(FilterSet):
@@ -29,6 +35,7 @@ class RecipeFilterSet(FilterSet):
     author = filters.ModelChoiceFilter(queryset=User.objects.all())
     is_favorited = filters.BooleanFilter(method="get_is_favorited")
     is_in_shopping_cart = filters.BooleanFilter(method="get_is_shopping_cart")
+    search = CharFilter(method="get_search")
 
     def get_is_favorited(self, queryset, name, value):
         if value:
@@ -44,6 +51,10 @@ class RecipeFilterSet(FilterSet):
             )
         return queryset
 
+    def get_search(self, queryset, name, value):
+        """Поиск по названию с опечатками, лучшие совпадения первыми."""
+        return trigram_search(queryset, 'name', value)
+
     class Meta:
         model = Recipe
         fields = (
@@ -51,4 +62,5 @@ class RecipeFilterSet(FilterSet):
             'author',
             'is_favorited',
             'is_in_shopping_cart',
+            'search',
         )
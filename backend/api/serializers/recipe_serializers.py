@@ -1,17 +1,22 @@
-from django.db import transaction
+from django.db import IntegrityError, transaction
+from django.db.models import Manager
 from django.conf import settings
-from django.shortcuts import get_object_or_404
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
 from rest_framework.validators import UniqueTogetherValidator
 
 from api.serializers.users_serializers import UserSerializer
+from core.cache import (get_recipe_fragments, recipe_fragment_keys,
+                        set_recipe_fragments)
 from core.field_mixins import CustomBase64ImageFieldMixin
-from core.mixins import GetFavorites, GetRecipe, GetShoppingList
+from core.mixins import (GetFavorites, GetIsSubscribed, GetRecipe,
+                         GetShoppingList)
 from core.validators import (ValidateRecipeMixin, validate_ingredients,
                              validate_tags)
-from obsceneLang.validators import validate_no_obscenities
+from obsceneLang.validators import validate_fields_no_obscenities
 from recipes.models import (Favourites, Ingredient, IngredientQuantity,
-                            Recipe, Shopping, Tag)
+                            Recipe, Shopping, Tag, recipe_fingerprint)
+from users.models import User
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -83,12 +88,8 @@ class IngredientQuantitySerializer(serializers.ModelSerializer):
         )
 
     def validate(self, data):
-        id = data.get('id')
         amount = data.get('amount')
 
-        if not Ingredient.objects.filter(id=id).exists():
-            raise serializers.ValidationError("Ингредиента не существует.")
-
         if amount < settings.MIN_VALUE:
             raise serializers.ValidationError(
                 ("Количество ингредиента должно быть"
@@ -137,26 +138,34 @@ class ShoppingListSerializer(serializers.ModelSerializer):
         ]
 
 
-class GetRecipeSerializer(serializers.ModelSerializer,
-                          GetRecipe,
-                          GetFavorites,
-                          GetShoppingList,):
-    """Сериалайзер только для чтения."""
+class RecipeAuthorSerializer(serializers.ModelSerializer):
+    """Сериалайзер автора во фрагменте рецепта, без подписки."""
 
-    author = UserSerializer(read_only=True)
+    class Meta:
+        model = User
+        fields = (
+            'id',
+            'username',
+            'first_name',
+            'last_name',
+            'email',
+        )
+
+
+class RecipeFragmentSerializer(serializers.ModelSerializer):
+    """Сериалайзер части рецепта, одинаковой для всех пользователей."""
+
+    author = RecipeAuthorSerializer(read_only=True)
     tags = TagSerializer(read_only=True, many=True)
     ingredients = GetIngredientQuantitySerializer(
         read_only=True,
         many=True,
         source="ingredient_quantity"
     )
-    is_favorited = serializers.SerializerMethodField(
-        read_only=True
-    )
-    is_in_shopping_cart = serializers.SerializerMethodField(
-        read_only=True
-    )
     image = serializers.SerializerMethodField(read_only=True)
+    image_renditions = serializers.ReadOnlyField(
+        source='image_rendition_urls'
+    )
 
     class Meta:
         model = Recipe
@@ -165,20 +174,111 @@ class GetRecipeSerializer(serializers.ModelSerializer,
             "tags",
             "author",
             "ingredients",
-            "is_favorited",
-            "is_in_shopping_cart",
             "name",
             "image",
+            "image_renditions",
             "text",
             "cooking_time",
         )
 
     def get_image(self, obj):
-        if obj.image:
-            return obj.image.url
+        if obj.display_image:
+            return obj.display_image.url
         return None
 
 
+class CachedRecipeListSerializer(serializers.ListSerializer):
+    """Список рецептов, собранный из закэшированных фрагментов."""
+
+    def to_representation(self, data):
+        recipes = data.all() if isinstance(data, Manager) else data
+        return self.child.render(list(recipes))
+
+
+class GetRecipeSerializer(serializers.Serializer,
+                          GetRecipe,
+                          GetFavorites,
+                          GetShoppingList,
+                          GetIsSubscribed):
+    """Сериалайзер только для чтения.
+
+    Общая для всех часть рецепта (её поля описаны
+    в RecipeFragmentSerializer) берётся из кэша фрагментов,
+    поверх неё добавляются отметки текущего пользователя.
+    Meta.fields задаёт порядок полей в ответе.
+
+    Если в контексте передан fresh_fragments, фрагменты строятся
+    из БД без кэша - для ответов на запись, когда кэш ещё
+    не сброшен до фиксации транзакции.
+    """
+
+    class Meta:
+        fields = (
+            "id",
+            "tags",
+            "author",
+            "ingredients",
+            "is_favorited",
+            "is_in_shopping_cart",
+            "name",
+            "image",
+            "image_renditions",
+            "text",
+            "cooking_time",
+        )
+        list_serializer_class = CachedRecipeListSerializer
+
+    def to_representation(self, instance):
+        rendered = self.render([instance])
+        if not rendered:
+            raise NotFound
+        return rendered[0]
+
+    def render(self, recipes):
+        """Представления рецептов из фрагментов и отметок пользователя.
+
+        Недостающие фрагменты строятся одним запросом на все рецепты
+        и сохраняются в кэш, если не передан fresh_fragments.
+
+        Args:
+            recipes (list[Recipe]): рецепты, можно без связанных объектов.
+
+        Returns:
+            list[dict]: представления рецептов в том же порядке.
+        """
+        use_cache = not self.context.get('fresh_fragments')
+        keys = fragments = {}
+        if use_cache:
+            keys = recipe_fragment_keys(recipe.pk for recipe in recipes)
+            fragments = get_recipe_fragments(keys)
+        missing = [recipe.pk for recipe in recipes
+                   if recipe.pk not in fragments]
+        if missing:
+            fragment_serializer = RecipeFragmentSerializer()
+            rendered = {
+                recipe.pk: fragment_serializer.to_representation(recipe)
+                for recipe in Recipe.objects.for_read().filter(
+                    pk__in=missing
+                )
+            }
+            if use_cache:
+                set_recipe_fragments(keys, rendered)
+            fragments = {**fragments, **rendered}
+        return [self.overlay(fragments[recipe.pk], recipe)
+                for recipe in recipes if recipe.pk in fragments]
+
+    def overlay(self, fragment, recipe):
+        """Добавить к фрагменту отметки текущего пользователя."""
+        data = dict(fragment)
+        data['author'] = dict(
+            fragment['author'],
+            is_subscribed=self.is_subscribed_to(fragment['author']['id']),
+        )
+        data['is_favorited'] = self.get_is_favorited(recipe)
+        data['is_in_shopping_cart'] = self.get_is_in_shopping_cart(recipe)
+        return {field: data[field] for field in self.Meta.fields}
+
+
 class RecipeSerializer(serializers.ModelSerializer,
                        GetRecipe,
                        ValidateRecipeMixin):
@@ -191,7 +291,6 @@ class RecipeSerializer(serializers.ModelSerializer,
     )
     name = serializers.CharField(
         max_length=settings.RECIPE_NAME_MAX_LENGTH,
-        validators=(validate_no_obscenities,)
     )
     image = CustomBase64ImageFieldMixin()
 
@@ -209,61 +308,159 @@ class RecipeSerializer(serializers.ModelSerializer,
         )
 
     def make_tags(self, instance, tags):
-        """Добавление тегов к рецепту."""
+        """Добавление тегов к рецепту.
+
+        set() сам сравнивает с текущими тегами и меняет только разницу.
+        """
         instance.tags.set(tags)
 
     def make_ingredients(self, instance, valid_ingredients):
-        """Добавление ингредиентов к рецепту."""
-        objects = []
-        for data in valid_ingredients:
-            amount = data.get('amount')
-            ingredients = get_object_or_404(Ingredient, id=data.get('id'))
-            objects.append(
-                IngredientQuantity(
-                    recipe=instance,
-                    ingredients=ingredients,
-                    amount=amount,
-                )
+        """Добавление ингредиентов к рецепту.
+
+        Ингредиенты уже загружены в validate_ingredients.
+        """
+        IngredientQuantity.objects.bulk_create(
+            IngredientQuantity(
+                recipe=instance,
+                ingredients=data['ingredient'],
+                amount=data['amount'],
             )
-        IngredientQuantity.objects.bulk_create(objects)
+            for data in valid_ingredients
+        )
+
+    def get_fingerprint(self, data, instance=None):
+        """Отпечаток рецепта после сохранения data.
+
+        Поля, тегов и ингредиентов которых нет в data,
+        берутся из instance.
+        """
+        def value(field):
+            return data[field] if field in data else getattr(instance, field)
+
+        if 'ingredients' in data:
+            ingredients = ((item['ingredient'].id, item['amount'])
+                           for item in data['ingredients'])
+        else:
+            ingredients = instance.ingredient_quantity.values_list(
+                'ingredients_id', 'amount'
+            )
+        if 'tags' in data:
+            tags = (tag.id for tag in data['tags'])
+        else:
+            tags = instance.tags.values_list('id', flat=True)
+        return recipe_fingerprint(value('name'), value('text'),
+                                  value('cooking_time'), ingredients, tags)
 
     @transaction.atomic
     def create(self, validated_data):
-        """Создание рецепта - POST."""
+        """Создание рецепта - POST.
+
+        Если у автора уже есть рецепт с тем же содержимым
+        (например, POST повторён), возвращается он. Дубликат ищется
+        по уникальному индексу (author, fingerprint).
+        """
+        fingerprint = self.get_fingerprint(validated_data)
+        author = validated_data['author']
+        recipe = Recipe.objects.filter(author=author,
+                                       fingerprint=fingerprint).first()
+        if recipe is not None:
+            return recipe
         ingredients = validated_data.pop('ingredients')
         tags = validated_data.pop('tags')
-        recipe, is_created = Recipe.objects.get_or_create(**validated_data)
-        if is_created:
-            self.make_tags(recipe, tags)
-            self.make_ingredients(recipe, ingredients)
+        recipe = Recipe(fingerprint=fingerprint, **validated_data)
+        try:
+            with transaction.atomic():
+                recipe.save()
+        except IntegrityError:
+            recipe.image.delete(save=False)
+            return Recipe.objects.get(author=author, fingerprint=fingerprint)
+        self.make_tags(recipe, tags)
+        self.make_ingredients(recipe, ingredients)
         return recipe
 
     def validate(self, data):
         """Валидация полей при создании рецепта."""
-        ingredients = self.initial_data.get('ingredients')
-        validated_ingredients = validate_ingredients(ingredients)
-        data['ingredients'] = validated_ingredients
-
-        tags = self.initial_data.get('tags')
-        validated_tags = validate_tags(tags)
-        data['tags'] = validated_tags
+        checked_fields = ['name']
+        if 'text' in data:
+            if settings.RECIPE_TEXT_MODERATION_ASYNC:
+                data['moderation_status'] = Recipe.ModerationStatus.PENDING
+            else:
+                checked_fields.append('text')
+                data['moderation_status'] = Recipe.ModerationStatus.APPROVED
+        validate_fields_no_obscenities({
+            field: data[field] for field in checked_fields if field in data
+        })
+
+        if not self.partial or 'ingredients' in self.initial_data:
+            ingredients = data.get('ingredients')
+            validated_ingredients = validate_ingredients(ingredients)
+            data['ingredients'] = validated_ingredients
+
+        if not self.partial or 'tags' in self.initial_data:
+            tags = self.initial_data.get('tags')
+            validated_tags = validate_tags(tags)
+            data['tags'] = validated_tags
 
         return data
 
+    def update_ingredients(self, instance, valid_ingredients):
+        """Изменение ингредиентов рецепта по разнице с текущими.
+
+        Удаляются только убранные ингредиенты, добавляются только
+        новые, у оставшихся меняется количество, если оно другое.
+        """
+        current = {
+            quantity.ingredients_id: quantity
+            for quantity in IngredientQuantity.objects.filter(recipe=instance)
+        }
+        wanted = {data['ingredient'].id: data for data in valid_ingredients}
+        removed = current.keys() - wanted.keys()
+        if removed:
+            IngredientQuantity.objects.filter(
+                recipe=instance, ingredients_id__in=removed
+            ).delete()
+        self.make_ingredients(instance, [
+            data for id, data in wanted.items() if id not in current
+        ])
+        changed = []
+        for id, quantity in current.items():
+            if id in wanted and quantity.amount != wanted[id]['amount']:
+                quantity.amount = wanted[id]['amount']
+                changed.append(quantity)
+        IngredientQuantity.objects.bulk_update(changed, ('amount',))
+
     @transaction.atomic
     def update(self, instance, validated_data):
-        """Обновление рецепта - PATCH."""
-        instance.tags.clear()
-        tags = validated_data.pop('tags')
-        self.make_tags(instance, tags)
-
-        IngredientQuantity.objects.filter(recipe=instance).delete()
-        ingredients = validated_data.pop('ingredients')
-        self.make_ingredients(instance, ingredients)
-        return super().update(instance, validated_data)
+        """Обновление рецепта - PATCH.
+
+        Теги и ингредиенты меняются только если переданы,
+        и только на разницу с текущими.
+        """
+        validated_data['fingerprint'] = self.get_fingerprint(validated_data,
+                                                             instance)
+        tags = validated_data.pop('tags', None)
+        if tags is not None:
+            self.make_tags(instance, tags)
+
+        ingredients = validated_data.pop('ingredients', None)
+        if ingredients is not None:
+            self.update_ingredients(instance, ingredients)
+        try:
+            with transaction.atomic():
+                return super().update(instance, validated_data)
+        except IntegrityError:
+            raise serializers.ValidationError(
+                'У вас уже есть рецепт с таким содержимым.'
+            )
 
     def to_representation(self, instance):
-        """Для чтения используется GetRecipeSerializer."""
+        """Для чтения используется GetRecipeSerializer.
+
+        Отметки пользователя перечитываются тем же запросом,
+        что и при чтении через API, фрагмент строится без кэша.
+        """
         request = self.context.get('request')
-        context = {'request': request}
+        context = {'request': request, 'fresh_fragments': True}
+        instance = (Recipe.objects.annotate_user_flags(request.user)
+                    .get(pk=instance.pk))
         return GetRecipeSerializer(instance, context=context).data
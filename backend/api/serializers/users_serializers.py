@@ -6,7 +6,7 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
 from core.mixins import GetIsSubscribed, GetRecipe, GetRecipesCount
-from obsceneLang.validators import validate_no_obscenities
+from obsceneLang.validators import validate_fields_no_obscenities
 from users.models import Subscription, User
 
 
@@ -34,16 +34,13 @@ class UserSignUpSerializer(UserCreateSerializer):
     email = serializers.EmailField(max_length=settings.EMAIL_MAX_LENGTH)
     username = serializers.CharField(
         max_length=settings.USERNAME_MAX_LENGTH,
-        validators=(validate_no_obscenities,
-                    UnicodeUsernameValidator(),)
+        validators=(UnicodeUsernameValidator(),)
     )
     first_name = serializers.CharField(
         max_length=settings.FIRSTNAME_MAX_LENGTH,
-        validators=(validate_no_obscenities,)
     )
     last_name = serializers.CharField(
         max_length=settings.LASTNAME_MAX_LENGTH,
-        validators=(validate_no_obscenities,)
     )
     password = serializers.CharField(
         write_only=True,
@@ -63,6 +60,15 @@ class UserSignUpSerializer(UserCreateSerializer):
         )
         extra_kwargs = {'password': {'write_only': True}}
 
+    def validate(self, attrs):
+        """Проверка имени и логина за один проход по словарю."""
+        validate_fields_no_obscenities({
+            field: attrs[field]
+            for field in ('username', 'first_name', 'last_name')
+            if field in attrs
+        })
+        return super().validate(attrs)
+
 
 class SubscribtionSerializer(UserSerializer,
                              GetRecipe,
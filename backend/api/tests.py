@@ -0,0 +1,271 @@
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from core.cache import (get_recipe_fragments, invalidate_recipe_fragments,
+                        recipe_fragment_keys, set_recipe_fragments)
+from core.middleware import query_stats
+from core.testing import QueryBudgetMixin
+from recipes.models import (Favourites, Ingredient, IngredientQuantity,
+                            Recipe, Shopping, Tag)
+from users.models import Subscription, User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+GIF = (b'GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!'
+       b'\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00'
+       b'\x00\x02\x02D\x01\x00;')
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }},
+)
+class QueryBudgetTest(QueryBudgetMixin, TestCase):
+    """Запросы к API укладываются в settings.QUERY_BUDGETS.
+
+    Данных несколько на каждый вид связей, поэтому N+1
+    на любом из них выходит за лимит.
+    """
+
+    authors = 3
+    recipes_per_author = 4
+    ingredients_per_recipe = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='reader', email='reader@foodgram.ru',
+            first_name='Читатель', last_name='Читателев',
+            password='Sup3rPassword',
+        )
+        cls.token = Token.objects.create(user=cls.user)
+        tags = [Tag.objects.create(name=f'Тег {number}',
+                                   color=f'#00000{number}',
+                                   slug=f'tag-{number}')
+                for number in range(3)]
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {number}', measurement_unit='г')
+            for number in range(20)
+        )
+        for author_number in range(cls.authors):
+            author = User.objects.create_user(
+                username=f'author{author_number}',
+                email=f'author{author_number}@foodgram.ru',
+                first_name='Автор', last_name='Авторов',
+                password='Sup3rPassword',
+            )
+            Subscription.objects.create(user=cls.user, author=author)
+            for number in range(cls.recipes_per_author):
+                recipe = Recipe.objects.create(
+                    author=author,
+                    name=f'Рецепт {author_number}-{number}',
+                    text='Описание',
+                    cooking_time=10,
+                    image=SimpleUploadedFile('recipe.gif', GIF,
+                                             content_type='image/gif'),
+                )
+                recipe.tags.set(tags[:2])
+                IngredientQuantity.objects.bulk_create(
+                    IngredientQuantity(recipe=recipe,
+                                       ingredients=ingredient,
+                                       amount=number + 1)
+                    for ingredient in ingredients[
+                        number:number + cls.ingredients_per_recipe
+                    ]
+                )
+                Favourites.objects.create(user=cls.user, recipe=recipe)
+                Shopping.objects.create(user=cls.user, recipe=recipe)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {self.token}'
+
+    def test_budgets(self):
+        requests = (
+            ('GET api:recipes-list', '/api/recipes/'),
+            ('GET api:users-subscriptions', '/api/users/subscriptions/'),
+            ('GET api:ingredients-list', '/api/ingredients/'),
+            ('GET api:recipes-download-shopping-cart',
+             '/api/recipes/download_shopping_cart/'),
+        )
+        for view_name, url in requests:
+            with self.subTest(view=view_name):
+                response = self.assert_query_budget(view_name,
+                                                    self.client.get, url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_recipes_list_filters(self):
+        for query in ('is_favorited=1', 'is_in_shopping_cart=1',
+                      'tags=tag-0', f'author={self.user.pk}'):
+            with self.subTest(query=query):
+                response = self.assert_query_budget(
+                    'GET api:recipes-list', self.client.get,
+                    f'/api/recipes/?{query}'
+                )
+                self.assertEqual(response.status_code, 200)
+
+
+class QueryStatsTest(TestCase):
+    """Сводка запросов и кэша вердиктов доступна только администратору."""
+
+    def test_query_stats(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@foodgram.ru',
+            first_name='Админ', last_name='Админов',
+            password='Sup3rPassword',
+        )
+        user = User.objects.create_user(
+            username='user', email='user@foodgram.ru',
+            first_name='Юзер', last_name='Юзеров',
+            password='Sup3rPassword',
+        )
+        self.client.get('/api/tags/')
+        url = '/api/query-stats/'
+        self.assertEqual(self.client.get(url).status_code, 401)
+        token = Token.objects.create(user=user)
+        self.assertEqual(self.client.get(
+            url, HTTP_AUTHORIZATION=f'Token {token}'
+        ).status_code, 403)
+        token = Token.objects.create(user=admin)
+        response = self.client.get(url, HTTP_AUTHORIZATION=f'Token {token}')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIn('GET api:tags-list', data['views'])
+        self.assertEqual(set(data['verdict_cache']),
+                         {'hits', 'misses', 'size', 'maxsize'})
+
+    def test_unresolved_urls_share_one_key(self):
+        query_stats.clear()
+        for number in range(3):
+            self.client.get(f'/api/nope-{number}/')
+        self.assertEqual(list(query_stats.summary()), ['GET <unresolved>'])
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+}})
+class RecipeFragmentCacheTest(TestCase):
+    """Фрагмент, построенный до изменения рецепта, не читается после."""
+
+    def test_stale_fragment_is_not_served(self):
+        cache.clear()
+        keys = recipe_fragment_keys((1,))
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_recipe_fragments((1,))
+        set_recipe_fragments(keys, {1: {'name': 'старое'}})
+        self.assertEqual(get_recipe_fragments(recipe_fragment_keys((1,))),
+                         {})
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }},
+)
+class RecipeWriteResponseTest(TestCase):
+    """Ответ на запись строится без кэша фрагментов.
+
+    В TestCase транзакция не фиксируется, поэтому фрагмент,
+    прочитанный до изменения, остаётся в кэше.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='writer', email='writer@foodgram.ru',
+            first_name='Автор', last_name='Авторов',
+            password='Sup3rPassword',
+        )
+        cls.token = Token.objects.create(user=cls.author)
+        cls.recipe = Recipe.objects.create(
+            author=cls.author, name='Рецепт', text='Описание',
+            cooking_time=10,
+            image=SimpleUploadedFile('recipe.gif', GIF,
+                                     content_type='image/gif'),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Token {self.token}'
+
+    def test_patch_returns_new_values(self):
+        url = f'/api/recipes/{self.recipe.pk}/'
+        self.assertEqual(self.client.get(url).json()['cooking_time'], 10)
+        response = self.client.patch(url, {'cooking_time': 20},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['cooking_time'], 20)
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }},
+)
+class TrigramSearchTest(TestCase):
+    """Поиск по ?search= находит названия с опечатками."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=name, measurement_unit='г')
+            for name in ('сахар', 'сахарная пудра', 'молоко', 'чеснок',
+                         'соль', 'масло сливочное')
+        )
+        author = User.objects.create_user(
+            username='cook', email='cook@foodgram.ru',
+            first_name='Повар', last_name='Поваров',
+            password='Sup3rPassword',
+        )
+        for name in ('Борщ украинский', 'Блины на молоке', 'Салат'):
+            Recipe.objects.create(
+                author=author, name=name, text='Описание', cooking_time=10,
+                image=SimpleUploadedFile('recipe.gif', GIF,
+                                         content_type='image/gif'),
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, url, query):
+        response = self.client.get(url, {'search': query})
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        results = data['results'] if isinstance(data, dict) else data
+        return [item['name'] for item in results]
+
+    def test_ingredients_with_typos(self):
+        for query, expected in (('сохар', 'сахар'), ('малоко', 'молоко'),
+                                ('чеснак', 'чеснок')):
+            with self.subTest(query=query):
+                found = self.search('/api/ingredients/', query)
+                self.assertEqual(found[:1], [expected])
+                self.assertNotIn('соль', found)
+
+    def test_recipes_with_typos(self):
+        for query, expected in (('борш', 'Борщ украинский'),
+                                ('блыны', 'Блины на молоке')):
+            with self.subTest(query=query):
+                found = self.search('/api/recipes/', query)
+                self.assertEqual(found[:1], [expected])
+                self.assertNotIn('Салат', found)
+
+    def test_ranking(self):
+        self.assertEqual(self.search('/api/ingredients/', 'сахар'),
+                         ['сахар', 'сахарная пудра'])
+
+    def test_unrelated_query(self):
+        self.assertEqual(self.search('/api/ingredients/', 'кофе'), [])
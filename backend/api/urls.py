@@ -4,6 +4,7 @@ from rest_framework import routers
 from api.views.recipes_views import (IngredientViewSet,
                                      RecipeViewSet,
                                      TagViewSet)
+from api.views.stats_views import QueryStatsView
 from api.views.users_views import UserViewSet
 
 app_name = 'api'
@@ -15,6 +16,7 @@ router.register('tags', TagViewSet, basename='tags')
 router.register('ingredients', IngredientViewSet, basename='ingredients')
 
 urlpatterns = [
+    path('query-stats/', QueryStatsView.as_view(), name='query-stats'),
     path('', include(router.urls)),
     path('auth/', include('djoser.urls.authtoken')),
 ]
@@ -1,4 +1,6 @@
-from django.db.models import Sum
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q, Sum
 from rest_framework import permissions, viewsets
 from rest_framework.decorators import action
 
@@ -9,15 +11,20 @@ from api.serializers.recipe_serializers import (FavouriteListSerializer,
                                                 ShoppingListSerializer,
                                                 TagSerializer,
                                                 GetRecipeSerializer)
-from core.mixins import ListAndRetrieveModelMixin, PDFResponseMixin
+from core.mixins import (ConditionalGetMixin, ListAndRetrieveModelMixin,
+                         PDFResponseMixin, SnapshotMixin)
 from core.pagination import CustomPagination
 from core.permissions import IsAuthorOrAdminOrReadOnly
+from core.snapshot import ReferenceSnapshot
 from core.utils import recipe_post_delete_action
 from recipes.models import (Favourites, Ingredient, IngredientQuantity,
                             Recipe, Shopping, Tag)
+from users.models import Subscription, User
 
 
-class TagViewSet(ListAndRetrieveModelMixin):
+class TagViewSet(ConditionalGetMixin,
+                 SnapshotMixin,
+                 ListAndRetrieveModelMixin):
     """ViewSet для регистрации пользователей.
 
     Args:
@@ -26,9 +33,13 @@ class TagViewSet(ListAndRetrieveModelMixin):
 
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    etag_models = (Tag,)
+    snapshot = ReferenceSnapshot(Tag, TagSerializer)
 
 
-class IngredientViewSet(ListAndRetrieveModelMixin):
+class IngredientViewSet(ConditionalGetMixin,
+                        SnapshotMixin,
+                        ListAndRetrieveModelMixin):
     """ViewSet для ингредиентов.
 
     Args:
@@ -38,9 +49,15 @@ class IngredientViewSet(ListAndRetrieveModelMixin):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     filterset_class = IngredientFilterSet
+    etag_models = (Ingredient,)
+    snapshot = ReferenceSnapshot(Ingredient, IngredientSerializer,
+                                 search_field='name')
+    snapshot_search_param = 'name'
+    snapshot_search_limit = settings.INGREDIENT_SEARCH_LIMIT
 
 
-class RecipeViewSet(viewsets.ModelViewSet,
+class RecipeViewSet(ConditionalGetMixin,
+                    viewsets.ModelViewSet,
                     PDFResponseMixin):
     """ViewSet для рецептов, список покупок и избранного.
 
@@ -48,12 +65,52 @@ class RecipeViewSet(viewsets.ModelViewSet,
         CSVResponseMixin (type): Кастомный миксин для экспорта csv-файла.
     """
 
-    queryset = (Recipe.objects.select_related('author')
-                .prefetch_related('tags', 'ingredients').all())
+    queryset = Recipe.objects.select_related('author')
     permission_classes = (IsAuthorOrAdminOrReadOnly, )
     filterset_class = RecipeFilterSet
     serializer_class = RecipeSerializer
     pagination_class = CustomPagination
+    cursor_ordering = ('-pub_date', '-id')
+    etag_user_dependent = True
+    etag_detail_models = (Tag, Ingredient, User,
+                          Favourites, Shopping, Subscription)
+    etag_models = etag_detail_models + (Recipe, Recipe.tags.through,
+                                        IngredientQuantity)
+
+    def get_queryset(self):
+        """В списках только опубликованные рецепты.
+
+        Рецепты на модерации и отклонённые доступны только автору.
+        Отметки избранного и списка покупок считаются в том же запросе.
+        """
+        user = self.request.user
+        queryset = super().get_queryset().annotate_user_flags(user)
+        approved = Q(moderation_status=Recipe.ModerationStatus.APPROVED)
+        if self.action == 'list' or user.is_anonymous:
+            return queryset.filter(approved)
+        return queryset.filter(approved | Q(author=user))
+
+    def get_etag_models(self):
+        """Рецепт целиком меняется вместе с updated_at.
+
+        Сериалайзер и админка сохраняют рецепт при любом изменении
+        его тегов и ингредиентов.
+        """
+        if self.action == 'retrieve':
+            return self.etag_detail_models
+        return self.etag_models
+
+    def get_etag_parts(self):
+        """Для рецепта - время его изменения, одним запросом по pk."""
+        if self.action != 'retrieve':
+            return []
+        try:
+            updated_at = (self.get_queryset()
+                          .filter(pk=self.kwargs['pk'])
+                          .values_list('updated_at', flat=True).first())
+        except (ValueError, DjangoValidationError):
+            return None
+        return None if updated_at is None else [updated_at.isoformat()]
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
@@ -0,0 +1,24 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.middleware import query_stats
+from obsceneLang.utils import verdict_cache
+
+
+class QueryStatsView(APIView):
+    """Сводка SQL-запросов по view из QueryCountMiddleware.
+
+    Рядом отдаются счётчики кэша вердиктов проверки слов,
+    по ним подбирается FORBIDDEN_VERDICT_CACHE_SIZE.
+    Доступна только администраторам. Сводка своя у каждого
+    процесса, отдаётся сводка процесса, принявшего запрос.
+    """
+
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request):
+        return Response({
+            'views': query_stats.summary(),
+            'verdict_cache': verdict_cache.info(),
+        })
@@ -1,3 +1,4 @@
+from django.db.models import Count, Prefetch, Q
 from django.shortcuts import get_object_or_404
 from djoser.views import UserViewSet as BaseUserViewSet
 from rest_framework import permissions, status
@@ -7,8 +8,9 @@ from rest_framework.response import Response
 from api.serializers.users_serializers import (SubscribtionCheckSerializer,
                                                SubscribtionSerializer,
                                                UserSerializer)
-from core.pagination import CustomPagination
+from core.pagination import COUNT_ESTIMATED, CustomPagination
 from core.utils import user_post_delete_action
+from recipes.models import Recipe
 from users.models import Subscription, User
 
 
@@ -19,6 +21,7 @@ class UserViewSet(BaseUserViewSet):
     serializer_class = UserSerializer
     permission_classes = (permissions.AllowAny,)
     pagination_class = CustomPagination
+    count_mode = COUNT_ESTIMATED
 
     def create(self, request, *args, **kwargs):
         """Переопределение метода create для разрешения регистрации."""
@@ -77,7 +80,21 @@ class UserViewSet(BaseUserViewSet):
     )
     def subscriptions(self, request):
         """Получение списка подписок."""
-        queryset = User.objects.filter(author__user=request.user)
+        queryset = (
+            User.objects.filter(author__user=request.user)
+            .annotate(approved_recipes_count=Count(
+                'recipes',
+                filter=Q(recipes__moderation_status=(
+                    Recipe.ModerationStatus.APPROVED
+                )),
+            ))
+            .prefetch_related(Prefetch(
+                'recipes',
+                queryset=Recipe.objects.approved(),
+                to_attr='approved_recipes',
+            ))
+            .order_by('id')
+        )
         pages = self.paginate_queryset(queryset)
         serializer = SubscribtionSerializer(
             pages,
@@ -36,6 +36,7 @@ DJANGO_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'django_extensions',
 ]
 
@@ -58,6 +59,7 @@ PROJECT_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + PROJECT_APPS
 
 MIDDLEWARE = [
+    'core.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -107,6 +109,19 @@ DATABASES = {
 #     }
 # }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    }
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -141,6 +156,12 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 AUTH_USER_MODEL = 'users.User'
 
 PAGE_COUNT = 6
+PAGINATION_COUNT_MODE = os.getenv(
+    'PAGINATION_COUNT_MODE',
+    default='cached',
+)  # Подсчёт объектов в пагинации: 'exact', 'cached' или 'estimated'
+PAGINATION_COUNT_CACHE_TIMEOUT = 60  # Время жизни кэша COUNT(*), сек
+PAGINATION_ESTIMATE_MIN_COUNT = 100000  # Мин. оценка строк для 'estimated'
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
@@ -173,8 +194,17 @@ DJOSER = {
 
 USERNAME_MAX_LENGTH = 150  # Максимальный размер логина
 WORD_MAX_LENGTH = 50  # Максимальный размер слова
+TARGET_MAX_LENGTH = 100  # Максимальный размер названия модели
 COMMENTS_MAX_LENGTH = 75  # Максимальный размер комментария
 THRESHOLD = 2  # Порог для расстояния Левенштейна
+FORBIDDEN_WORDS_MATCH_MODE = os.getenv(
+    'FORBIDDEN_WORDS_MATCH_MODE',
+    default='word',
+)  # 'word' - по словам, 'substring' - ещё и вхождения внутри слов
+FORBIDDEN_VERDICT_CACHE_SIZE = 10000  # Размер LRU-кэша вердиктов по словам
+FORBIDDEN_WORDS_COMPILED_PATH = os.getenv(
+    'FORBIDDEN_WORDS_COMPILED_PATH'
+)  # Файл словаря запрещённых слов, общий для воркеров через mmap
 EMAIL_MAX_LENGTH = 254  # Максимальный размер email
 SLUG_MAX_LENGTH = 200  # Максимальный размер slug
 PASS_MAX_LENGTH = 150  # Максимальный размер password
@@ -190,6 +220,34 @@ MEASUREMENT_UNIT_MAX_LENGTH = 200  # Максимальный размер ед
 RECIPE_NAME_MAX_LENGTH = 200  # Максимальный размер названия рецепта
 CSV_FOLDER = f"{BASE_DIR}/static/data/"  # Расположение csv файлов
 RECIPE_IMAGE_SIZE = 600, 600  # Размер картинки
+RECIPE_IMAGE_RENDITIONS = {
+    'small': (150, 150),
+    'medium': (300, 300),
+    'large': RECIPE_IMAGE_SIZE,
+}  # Варианты картинки рецепта, каждый также сохраняется в WebP
+RECIPE_IMAGE_WORKERS = int(os.getenv(
+    'RECIPE_IMAGE_WORKERS',
+    default=2,
+))  # Потоков обработки картинок, 0 - обрабатывать сразу после коммита
+MODERATION_STATUS_MAX_LENGTH = 20  # Максимальный размер статуса модерации
+FINGERPRINT_MAX_LENGTH = 64  # Размер отпечатка содержимого рецепта
+RECIPE_TEXT_MODERATION_ASYNC = os.getenv(
+    'RECIPE_TEXT_MODERATION_ASYNC',
+    default='False',
+) == 'True'  # Проверять текст рецепта в фоне (manage.py moderate_recipes)
+MODERATION_POLL_INTERVAL = 2  # Пауза воркера модерации без задач, сек
+MODERATION_BATCH_SIZE = 50  # Кол-во рецептов, проверяемых за раз
+RESCAN_CHUNK_SIZE = 2000  # Кол-во строк в чанке при перепроверке контента
+SEARCH_SIMILARITY_THRESHOLD = 0.4  # Порог сходства триграмм в поиске
+INGREDIENT_SEARCH_LIMIT = 100  # Макс. кол-во ингредиентов в поиске по имени
+RECIPE_FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 24  # Время жизни фрагмента, сек
+QUERY_STATS_WINDOW = 100  # Кол-во последних запросов в сводке по view
+QUERY_BUDGETS = {
+    'GET api:recipes-list': 8,
+    'GET api:users-subscriptions': 8,
+    'GET api:ingredients-list': 4,
+    'GET api:recipes-download-shopping-cart': 6,
+}  # Лимиты SQL-запросов на метод и view, превышение пишется в лог
 
 GRAPH_MODELS = {
     'all_applications': True,
@@ -206,7 +264,21 @@ LOGGING = {
     },
     "loggers": {
         "django.db.backends": {
-            "level": "DEBUG",  # if DEBUG else 'ERROR',
+            "level": "DEBUG" if os.getenv(
+                'LOG_SQL', default='False'
+            ) == 'True' else "ERROR",
+            "handlers": [
+                "console",
+            ],
+        },
+        "core.middleware": {
+            "level": "WARNING",
+            "handlers": [
+                "console",
+            ],
+        },
+        "recipes.images": {
+            "level": "WARNING",
             "handlers": [
                 "console",
             ],
@@ -0,0 +1,122 @@
+from typing import Dict, Iterable
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+RECIPE_FRAGMENTS = 'recipe-fragments'
+RECIPE_FRAGMENT_FORMAT = 2  # Менять при изменении полей фрагмента
+
+
+def get_version(name: str) -> str:
+    """Текущая версия группы закэшированных данных.
+
+    Версия хранится в общем кэше, поэтому её смена видна
+    во всех процессах.
+    """
+    key = f'version:{name}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(name: str) -> None:
+    """Пометить все данные группы устаревшими во всех процессах."""
+    cache.set(f'version:{name}', uuid4().hex, None)
+
+
+def get_table_versions(tables: Iterable[str]) -> Dict[str, str]:
+    """Текущие версии таблиц БД, одним обращением к кэшу.
+
+    Версия таблицы меняется при любой записи в неё,
+    см. core.signals.
+    """
+    keys = {table: f'version:table:{table}' for table in tables}
+    versions = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    return {table: versions.get(key) for table, key in keys.items()}
+
+
+def bump_table_versions(tables: Iterable[str]) -> None:
+    """Пометить данные таблиц изменёнными во всех процессах."""
+    cache.set_many({f'version:table:{table}': uuid4().hex
+                    for table in tables}, None)
+
+
+def get_recipe_versions(pks: Iterable[int]) -> Dict[int, str]:
+    """Текущие версии рецептов, одним обращением к кэшу.
+
+    Версия рецепта меняется после фиксации транзакции,
+    изменившей рецепт, см. invalidate_recipe_fragments.
+    """
+    keys = {pk: f'version:recipe:{pk}' for pk in pks}
+    versions = cache.get_many(keys.values())
+    missing = [key for key in keys.values() if key not in versions]
+    if missing:
+        for key in missing:
+            cache.add(key, uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    return {pk: versions.get(key) for pk, key in keys.items()}
+
+
+def recipe_fragment_keys(pks: Iterable[int]) -> Dict[int, str]:
+    """Ключи кэша фрагментов рецептов по их pk.
+
+    В ключ входят общая версия фрагментов и версия рецепта,
+    поэтому ключи надо получить до чтения рецептов из БД
+    и по ним же сохранять фрагменты: фрагмент, построенный
+    по данным до изменения рецепта, ляжет под старый ключ
+    и больше не будет прочитан.
+    """
+    version = get_version(RECIPE_FRAGMENTS)
+    return {
+        pk: (f'recipe-fragment:{RECIPE_FRAGMENT_FORMAT}:'
+             f'{version}:{recipe_version}:{pk}')
+        for pk, recipe_version in get_recipe_versions(pks).items()
+    }
+
+
+def get_recipe_fragments(keys: Dict[int, str]) -> Dict[int, dict]:
+    """Закэшированные фрагменты рецептов, одним обращением к кэшу.
+
+    Args:
+        keys (Dict[int, str]): ключи из recipe_fragment_keys
+    """
+    found = cache.get_many(keys.values())
+    return {pk: found[key] for pk, key in keys.items() if key in found}
+
+
+def set_recipe_fragments(keys: Dict[int, str],
+                         fragments: Dict[int, dict]) -> None:
+    """Сохранить фрагменты рецептов в кэш под ключами keys."""
+    cache.set_many({keys[pk]: fragment for pk, fragment in fragments.items()},
+                   settings.RECIPE_FRAGMENT_CACHE_TIMEOUT)
+
+
+def invalidate_recipe_fragments(pks: Iterable[int]) -> None:
+    """Сменить версии рецептов после фиксации транзакции.
+
+    Старые фрагменты остаются в кэше до истечения срока,
+    но под новыми ключами уже не читаются.
+    """
+    pks = list(pks)
+    transaction.on_commit(
+        lambda: cache.set_many({f'version:recipe:{pk}': uuid4().hex
+                                for pk in pks}, None)
+    )
+
+
+def invalidate_all_recipe_fragments() -> None:
+    """Сбросить фрагменты всех рецептов после фиксации транзакции.
+
+    Нужно при изменении тегов, ингредиентов и авторов,
+    которые входят во фрагменты многих рецептов.
+    """
+    transaction.on_commit(lambda: bump_version(RECIPE_FRAGMENTS))
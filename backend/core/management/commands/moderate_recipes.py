@@ -0,0 +1,60 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from core.cache import bump_table_versions
+from obsceneLang.validators import check_fields_for_obscenities
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = 'Moderate texts of pending recipes from the database queue'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once',
+                            action='store_true',
+                            help='Drain the queue once and exit')
+
+    def handle(self, *args, **options):
+        while True:
+            if self.moderate_batch(settings.MODERATION_BATCH_SIZE):
+                continue
+            if options['once']:
+                return
+            time.sleep(settings.MODERATION_POLL_INTERVAL)
+
+    @transaction.atomic
+    def moderate_batch(self, batch_size):
+        """Проверить пачку рецептов на модерации, заблокировав их строки."""
+        pending = Recipe.ModerationStatus.PENDING
+        recipes = list(
+            Recipe.objects.select_for_update(skip_locked=True)
+            .filter(moderation_status=pending)
+            .order_by('pk')
+            .only('pk', 'text')[:batch_size]
+        )
+        if not recipes:
+            return 0
+        verdicts = check_fields_for_obscenities(
+            {recipe.pk: recipe.text for recipe in recipes}
+        )
+        rejected = [pk for pk, is_forbidden in verdicts.items()
+                    if is_forbidden]
+        approved = [pk for pk, is_forbidden in verdicts.items()
+                    if not is_forbidden]
+        for status, pks in ((Recipe.ModerationStatus.REJECTED, rejected),
+                            (Recipe.ModerationStatus.APPROVED, approved)):
+            Recipe.objects.filter(
+                pk__in=pks, moderation_status=pending
+            ).update(moderation_status=status)
+        table = Recipe._meta.db_table
+        transaction.on_commit(lambda: bump_table_versions((table,)))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Moderated recipes: {len(approved)} approved, '
+                f'{len(rejected)} rejected'
+            )
+        )
+        return len(recipes)
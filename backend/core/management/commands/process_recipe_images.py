@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db.models import Q
+
+from recipes.images import PROCESSING_FIELDS, process_image
+from recipes.models import Recipe
+
+
+class Command(BaseCommand):
+    help = ('Process recipe images that have no processed version '
+            'or renditions yet')
+
+    def handle(self, *args, **options):
+        recipes = (Recipe.objects.filter(Q(processed_image='')
+                                         | Q(image_renditions={}))
+                   .exclude(image='')
+                   .only(*PROCESSING_FIELDS)
+                   .order_by('pk'))
+        processed = failed = 0
+        for recipe in recipes.iterator(chunk_size=settings.RESCAN_CHUNK_SIZE):
+            try:
+                processed += process_image(recipe)
+            except (OSError, ValueError) as error:
+                failed += 1
+                self.stderr.write(f'Recipe {recipe.pk}: {error}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Processed recipe images: {processed}, failed: {failed}'
+            )
+        )
@@ -0,0 +1,159 @@
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from django.db.models import Max
+
+from core.cache import bump_table_versions
+from obsceneLang.aho_corasick import AhoCorasick
+from obsceneLang.buckets import LengthBucketIndex
+from obsceneLang.dictionary import MATCH_MODE_SUBSTRING
+from obsceneLang.models import ForbiddenWord, RescanCheckpoint
+from obsceneLang.utils import get_tokens_from_value
+from recipes.models import Recipe
+from users.models import User
+
+_index = None
+_automaton = None
+_threshold = None
+
+
+def init_worker(words, threshold, mode):
+    """Построить индекс новых слов один раз на процесс пула."""
+    global _index, _automaton, _threshold
+    _index = LengthBucketIndex(words)
+    if mode == MATCH_MODE_SUBSTRING:
+        _automaton = AhoCorasick(words)
+    _threshold = threshold
+
+
+def check_rows(rows):
+    """Вернуть pk строк, в полях которых есть новые запрещённые слова."""
+    flagged = []
+    for pk, *values in rows:
+        tokens = set().union(
+            *(get_tokens_from_value(value or '') for value in values)
+        )
+        if (any(_index.has_within(token, _threshold) for token in tokens)
+                or _automaton is not None and any(
+                    _automaton.has_match(value.lower())
+                    for value in values if value)):
+            flagged.append(pk)
+    return flagged
+
+
+def chunked(iterable, size):
+    """Разбить поток строк на списки по size элементов."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Command(BaseCommand):
+    help = 'Re-check existing recipes and users against new forbidden words'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers',
+                            type=int,
+                            default=os.cpu_count(),
+                            help='Number of worker processes')
+        parser.add_argument('--chunk-size',
+                            type=int,
+                            default=settings.RESCAN_CHUNK_SIZE,
+                            help='Rows fetched and checked per chunk')
+        parser.add_argument('--restart',
+                            action='store_true',
+                            help='Drop the unfinished pass and start over')
+
+    def handle(self, *args, **options):
+        targets = (
+            (Recipe, ('name', 'text'), self.reject_recipes),
+            (User, ('username', 'first_name', 'last_name'),
+             self.report_users),
+        )
+        for model, fields, on_flagged in targets:
+            self.rescan(model, fields, on_flagged, options)
+
+    def rescan(self, model, fields, on_flagged, options):
+        """Перепроверить таблицу с места последней контрольной точки."""
+        checkpoint, _ = RescanCheckpoint.objects.get_or_create(
+            target=model._meta.label
+        )
+        if options['restart']:
+            checkpoint.pending_word_id = None
+        if checkpoint.pending_word_id is None:
+            latest = ForbiddenWord.objects.aggregate(Max('id'))['id__max']
+            if not latest or latest <= checkpoint.word_id:
+                self.stdout.write(f'{checkpoint}: no new forbidden words')
+                return
+            checkpoint.pending_word_id = latest
+            checkpoint.last_pk = 0
+            checkpoint.save()
+
+        words = [word.lower() for word in ForbiddenWord.objects.filter(
+            id__gt=checkpoint.word_id,
+            id__lte=checkpoint.pending_word_id,
+        ).values_list('word', flat=True)]
+        rows = (model.objects.filter(pk__gt=checkpoint.last_pk)
+                .order_by('pk')
+                .values_list('pk', *fields)
+                .iterator(chunk_size=options['chunk_size']))
+        workers = max(options['workers'] or 1, 1)
+        # Воркерам не нужна БД: индекс строится из переданных слов,
+        # поэтому достаточно fork без повторной инициализации Django.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('fork'),
+            initializer=init_worker,
+            initargs=(words, settings.THRESHOLD,
+                      settings.FORBIDDEN_WORDS_MATCH_MODE),
+        ) as pool:
+            in_flight = deque()
+            for chunk in chunked(rows, options['chunk_size']):
+                in_flight.append((chunk[-1][0],
+                                  pool.submit(check_rows, chunk)))
+                if len(in_flight) >= workers * 2:
+                    self.apply(checkpoint, *in_flight.popleft(), on_flagged)
+            while in_flight:
+                self.apply(checkpoint, *in_flight.popleft(), on_flagged)
+
+        checkpoint.word_id = checkpoint.pending_word_id
+        checkpoint.pending_word_id = None
+        checkpoint.last_pk = 0
+        checkpoint.save()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{checkpoint}: checked against {len(words)} new words'
+            )
+        )
+
+    def apply(self, checkpoint, last_pk, future, on_flagged):
+        """Обработать результат чанка и сдвинуть контрольную точку."""
+        flagged = future.result()
+        if flagged:
+            on_flagged(flagged)
+        checkpoint.last_pk = last_pk
+        checkpoint.save(update_fields=('last_pk',))
+
+    def reject_recipes(self, pks):
+        """Снять с публикации рецепты с запрещёнными словами."""
+        Recipe.objects.filter(pk__in=pks).update(
+            moderation_status=Recipe.ModerationStatus.REJECTED
+        )
+        bump_table_versions((Recipe._meta.db_table,))
+        self.stdout.write(
+            self.style.WARNING(f'Rejected recipes: {pks}')
+        )
+
+    def report_users(self, pks):
+        """Сообщить о пользователях с запрещёнными словами."""
+        self.stdout.write(
+            self.style.WARNING(f'Users with forbidden words: {pks}')
+        )
@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import ExitStack
+from typing import Deque, Dict, Tuple
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+# Общий ключ для запросов без view (например, 404), чтобы число
+# ключей в сводке не зависело от присланных адресов.
+UNRESOLVED_VIEW = '<unresolved>'
+
+
+class QueryCounter:
+    """Обёртка над выполнением SQL, считающая запросы и их время.
+
+    Подключается через connection.execute_wrapper.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+
+
+class QueryStats:
+    """Скользящая сводка числа запросов и времени БД по view.
+
+    Для каждой пары метод и view хранятся последние window запросов.
+
+    Params:
+        window (int): размер окна на один view
+    """
+
+    def __init__(self, window: int) -> None:
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[Tuple[int, float]]] = defaultdict(
+            lambda: deque(maxlen=window)
+        )
+
+    def record(self, view_name: str, count: int, duration: float) -> None:
+        """Добавить замер одного запроса к view."""
+        with self._lock:
+            self._samples[view_name].append((count, duration))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Сводка по view: число замеров, среднее и максимум."""
+        with self._lock:
+            samples = {name: list(values)
+                       for name, values in self._samples.items()}
+        return {
+            name: {
+                'requests': len(values),
+                'avg_queries': round(
+                    sum(count for count, _ in values) / len(values), 2
+                ),
+                'max_queries': max(count for count, _ in values),
+                'avg_db_ms': round(
+                    sum(duration for _, duration in values)
+                    / len(values) * 1000, 3
+                ),
+            }
+            for name, values in samples.items()
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._samples.clear()
+
+
+query_stats = QueryStats(settings.QUERY_STATS_WINDOW)
+
+
+class QueryCountMiddleware:
+    """Учёт SQL-запросов и времени БД на каждый HTTP-запрос.
+
+    Результат попадает в query_stats под ключом "<метод> <view>",
+    в режиме отладки отдаётся в заголовках X-DB-Query-Count
+    и X-DB-Query-Time (мс). Превышение лимита из settings.QUERY_BUDGETS
+    пишется в лог.
+    """
+
+    def __init__(self, get_response) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        view_name = (f'{request.method} '
+                     f'{match.view_name if match else UNRESOLVED_VIEW}')
+        query_stats.record(view_name, counter.count, counter.duration)
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is not None and counter.count > budget:
+            logger.warning(
+                '%s: %d SQL-запросов при лимите %d',
+                view_name, counter.count, budget,
+            )
+        if settings.DEBUG:
+            response['X-DB-Query-Count'] = str(counter.count)
+            response['X-DB-Query-Time'] = f'{counter.duration * 1000:.3f}'
+        return response
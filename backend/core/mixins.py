@@ -1,12 +1,17 @@
 import io
+from hashlib import md5
 from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import SimpleDocTemplate, Paragraph
 from reportlab.lib import styles
 from reportlab.lib.pagesizes import letter
-from rest_framework import mixins, viewsets
+from rest_framework import mixins, status, viewsets
+from rest_framework.response import Response
 
+from core.cache import get_table_versions
 from core.permissions import IsAdminOrReadOnly
 from core.serializers import CompactRecipeSerializer
 
@@ -15,9 +20,15 @@ class GetRecipe:
     """Миксин для получения списка рецептов."""
 
     def get_recipes(self, obj):
+        """Рецепты автора.
+
+        Берутся из предзагрузки approved_recipes, если она есть.
+        """
         request = self.context.get('request')
         limit = request.query_params.get('recipes_limit')
-        recipes = obj.recipes.all()
+        recipes = getattr(obj, 'approved_recipes', None)
+        if recipes is None:
+            recipes = obj.recipes.approved()
         if limit:
             recipes = recipes[:int(limit)]
         return CompactRecipeSerializer(recipes, many=True, read_only=True).data
@@ -27,24 +38,52 @@ class GetRecipesCount:
     """Миксин для получения кол-ва рецептов."""
 
     def get_recipes_count(self, obj):
-        return obj.recipes.count()
+        """Кол-во рецептов автора.
+
+        Берётся из аннотации approved_recipes_count, если она есть.
+        """
+        if hasattr(obj, 'approved_recipes_count'):
+            return obj.approved_recipes_count
+        return obj.recipes.approved().count()
 
 
 class GetIsSubscribed:
     """Миксин для проверки подписки."""
 
     def get_is_subscribed(self, obj):
-        """Отображение подписки на пользователя."""
+        """Отображение подписки на пользователя.
+
+        Id авторов, на которых подписан пользователь, загружаются
+        одним запросом и хранятся в контексте сериализатора, общем
+        для всех вложенных сериализаторов.
+        """
+        return self.is_subscribed_to(obj.id)
+
+    def is_subscribed_to(self, author_id):
+        """Подписан ли текущий пользователь на автора с author_id."""
         user = self.context.get('request').user
-        return (not user.is_anonymous
-                and user.follower.filter(author=obj.id).exists())
+        if user.is_anonymous:
+            return False
+        subscribed = self.context.get('subscribed_author_ids')
+        if subscribed is None:
+            subscribed = set(
+                user.follower.values_list('author_id', flat=True)
+            )
+            self.context['subscribed_author_ids'] = subscribed
+        return author_id in subscribed
 
 
 class GetFavorites:
     """Миксин для проверки списка избранного."""
 
     def get_is_favorited(self, obj):
-        """Находится ли в избранном."""
+        """Находится ли в избранном.
+
+        Берётся из аннотации RecipeQuerySet.annotate_user_flags,
+        если она есть.
+        """
+        if hasattr(obj, 'is_favorited'):
+            return obj.is_favorited
         user = self.context.get('request').user
         return (not user.is_anonymous
                 and user.favourites_list.filter(recipe=obj.id).exists())
@@ -54,7 +93,13 @@ class GetShoppingList:
     """Миксин для проверки списка покупок."""
 
     def get_is_in_shopping_cart(self, obj):
-        """Находится ли в списке покупок."""
+        """Находится ли в списке покупок.
+
+        Берётся из аннотации RecipeQuerySet.annotate_user_flags,
+        если она есть.
+        """
+        if hasattr(obj, 'is_in_shopping_cart'):
+            return obj.is_in_shopping_cart
         user = self.context.get('request').user
         return (not user.is_anonymous
                 and user.shopping_list.filter(recipe=obj.id).exists())
@@ -73,6 +118,141 @@ class ListAndRetrieveModelMixin(viewsets.GenericViewSet,
     pagination_class = None
 
 
+class ConditionalGetMixin:
+    """Миксин для условных GET-запросов по ETag.
+
+    ETag считается по версиям таблиц из etag_models, адресу запроса
+    и, если ответ зависит от пользователя, его id - без выборки
+    объектов и сериализации. На совпавший If-None-Match
+    отдаётся 304 без тела.
+    """
+
+    etag_models = ()
+    etag_user_dependent = False
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list,
+                                         request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve,
+                                         request, *args, **kwargs)
+
+    def get_etag_models(self):
+        """Модели, от изменений в которых зависит ответ."""
+        return self.etag_models
+
+    def get_etag_parts(self):
+        """Дополнительные части ETag.
+
+        Returns:
+            list | None: значения для ETag или None, если ETag
+                не нужен и ответ надо построить как обычно.
+        """
+        return []
+
+    def get_etag(self, request):
+        parts = self.get_etag_parts()
+        if parts is None:
+            return None
+        versions = get_table_versions(sorted(
+            {model._meta.db_table for model in self.get_etag_models()}
+        ))
+        signature = (
+            self.action,
+            request.get_full_path(),
+            request.META.get('HTTP_ACCEPT'),
+            request.user.pk if self.etag_user_dependent else None,
+            sorted(versions.items()),
+            parts,
+        )
+        return f'W/"{md5(repr(signature).encode()).hexdigest()}"'
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Ответ 304, если ETag клиента совпал, иначе обычный ответ."""
+        etag = self.get_etag(request)
+        if etag and etag_matches(etag,
+                                 request.META.get('HTTP_IF_NONE_MATCH')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if etag and response.status_code in (status.HTTP_200_OK,
+                                             status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            if self.etag_user_dependent:
+                patch_vary_headers(response, ('Authorization',))
+        return response
+
+
+class SnapshotMixin:
+    """Миксин для ответа из снимка справочника без сериализации.
+
+    Список без параметров запроса и объект по pk отдаются готовыми
+    байтами из snapshot (core.snapshot.ReferenceSnapshot), список -
+    в gzip, если клиент его принимает. Если задан snapshot_search_param,
+    поиск по нему (с необязательным limit) тоже идёт по снимку.
+    """
+
+    snapshot = None
+    snapshot_search_param = None
+    snapshot_search_limit = None
+
+    def use_snapshot(self, request):
+        return request.accepted_renderer.format == 'json'
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_snapshot(request):
+            return super().list(request, *args, **kwargs)
+        if self.snapshot_search_param in request.query_params:
+            return self.search_snapshot(request, *args, **kwargs)
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+        content, compressed = self.snapshot.get_list()
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            response = self.snapshot_response(request, compressed)
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = self.snapshot_response(request, content)
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        content = (self.snapshot.get_item(lookup)
+                   if self.use_snapshot(request) else None)
+        if content is None:
+            return super().retrieve(request, *args, **kwargs)
+        return self.snapshot_response(request, content)
+
+    def search_snapshot(self, request, *args, **kwargs):
+        """Поиск по снимку: сначала совпадения по префиксу."""
+        if not {self.snapshot_search_param, 'limit'}.issuperset(
+            request.query_params
+        ):
+            return super().list(request, *args, **kwargs)
+        limit = request.query_params.get('limit', '')
+        limit = (int(limit) if limit.isdigit() and int(limit) > 0
+                 else self.snapshot_search_limit)
+        return self.snapshot_response(request, self.snapshot.search(
+            request.query_params[self.snapshot_search_param], limit
+        ))
+
+    @staticmethod
+    def snapshot_response(request, content):
+        return HttpResponse(content,
+                            content_type=request.accepted_media_type)
+
+
+def etag_matches(etag, if_none_match):
+    """Совпадает ли ETag с заголовком If-None-Match (слабое сравнение)."""
+    if not if_none_match:
+        return False
+    etags = parse_etags(if_none_match)
+    return '*' in etags or etag.removeprefix('W/') in {
+        candidate.removeprefix('W/') for candidate in etags
+    }
+
+
 class PDFResponseMixin:
     """Миксин для преобразования данных в PDF."""
 
@@ -1,10 +1,228 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from functools import partial
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.cache import get_table_versions
+
+COUNT_EXACT = 'exact'
+COUNT_CACHED = 'cached'
+COUNT_ESTIMATED = 'estimated'
+
+
+def cached_count(queryset):
+    """COUNT(*) выборки, закэшированный по её SQL и версиям таблиц.
+
+    Ключ строится из текста запроса с параметрами, поэтому одинаковые
+    фильтры (в том числе по текущему пользователю) дают один ключ.
+    Запись в любую из таблиц запроса меняет ключ, короткий TTL
+    ограничивает устаревание при записи без сигналов.
+    """
+    queryset = queryset.order_by()
+    try:
+        sql, params = queryset.query.sql_with_params()
+    except EmptyResultSet:
+        return 0
+    tables = {queryset.model._meta.db_table}
+    tables.update(alias.table_name
+                  for alias in queryset.query.alias_map.values())
+    versions = get_table_versions(sorted(tables))
+    signature = md5(
+        repr((sql, params, sorted(versions.items()))).encode()
+    ).hexdigest()
+    key = f'count:{queryset.model._meta.label_lower}:{signature}'
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+def estimated_count(queryset):
+    """Оценка числа строк таблицы по статистике планировщика PostgreSQL.
+
+    Returns:
+        int | None: оценка или None, если она недоступна.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+            (queryset.model._meta.db_table,),
+        )
+        row = cursor.fetchone()
+    if not row or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def count_queryset(queryset, mode):
+    """Число объектов выборки в режиме exact, cached или estimated.
+
+    Оценка используется только для выборки без фильтров по таблице,
+    в которой строк не меньше PAGINATION_ESTIMATE_MIN_COUNT,
+    иначе число берётся из кэша.
+    """
+    if mode == COUNT_EXACT:
+        return queryset.count()
+    if mode == COUNT_ESTIMATED and not queryset.query.where:
+        estimate = estimated_count(queryset)
+        if (estimate is not None
+                and estimate >= settings.PAGINATION_ESTIMATE_MIN_COUNT):
+            return estimate
+    return cached_count(queryset)
+
+
+class CountingPaginator(DjangoPaginator):
+    """Django Paginator, считающий объекты выбранным способом."""
+
+    def __init__(self, *args, count_mode=COUNT_EXACT, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_mode = count_mode
+
+    @cached_property
+    def count(self):
+        return count_queryset(self.object_list, self.count_mode)
 
 
 class CustomPagination(PageNumberPagination):
     """
     Кастомный пагинатор для изменения
     объектов на страницы с помощью limit.
+
+    Если у view задан cursor_ordering и в запросе есть параметр
+    cursor (для первой страницы - пустой), выборка листается
+    по ключу из полей cursor_ordering, без COUNT(*) и OFFSET.
+
+    Общее число объектов считается способом из атрибута view
+    count_mode, по умолчанию - settings.PAGINATION_COUNT_MODE.
     """
 
     page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.ordering = getattr(view, 'cursor_ordering', None)
+        self.use_cursor = bool(
+            self.ordering
+            and self.cursor_query_param in request.query_params
+        )
+        if not self.use_cursor:
+            self.django_paginator_class = partial(
+                CountingPaginator,
+                count_mode=getattr(view, 'count_mode',
+                                   settings.PAGINATION_COUNT_MODE),
+            )
+            return super().paginate_queryset(queryset, request, view)
+        return self.paginate_by_cursor(queryset, request)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.next_link,
+            'previous': self.previous_link,
+            'results': data,
+        })
+
+    def paginate_by_cursor(self, queryset, request):
+        """Страница выборки после или до позиции из курсора.
+
+        Позиция - значения полей cursor_ordering у крайнего объекта
+        соседней страницы, поэтому любая страница стоит как первая.
+        """
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        reverse = bool(cursor and cursor['reverse'])
+        ordering = (self.reverse_ordering(self.ordering) if reverse
+                    else self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if cursor:
+            queryset = queryset.filter(
+                self.after_position(queryset.model, ordering,
+                                    cursor['position'])
+            )
+        page = list(queryset[:page_size + 1])
+        has_more = len(page) > page_size
+        page = page[:page_size]
+        if reverse:
+            page.reverse()
+
+        has_next = has_more if not reverse else True
+        has_previous = has_more if reverse else cursor is not None
+        self.next_link = (self.encode_cursor(page[-1], reverse=False)
+                          if page and has_next else None)
+        self.previous_link = (self.encode_cursor(page[0], reverse=True)
+                              if page and has_previous else None)
+        return page
+
+    @staticmethod
+    def reverse_ordering(ordering):
+        return tuple(field[1:] if field.startswith('-') else f'-{field}'
+                     for field in ordering)
+
+    def after_position(self, model, ordering, position):
+        """Условие "строго после позиции" в порядке ordering.
+
+        Для полей (a, b) это a < x OR (a = x AND b < y)
+        с поправкой на направление каждого поля.
+        """
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            try:
+                value = model._meta.get_field(name).to_python(value)
+            except DjangoValidationError:
+                raise NotFound(self.invalid_cursor_message)
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            position = cursor['p']
+            reverse = cursor['r']
+        except (BinasciiError, UnicodeError, ValueError,
+                KeyError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if (not isinstance(position, list)
+                or len(position) != len(self.ordering)):
+            raise NotFound(self.invalid_cursor_message)
+        return {'position': position, 'reverse': bool(reverse)}
+
+    def encode_cursor(self, obj, reverse):
+        position = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            position.append(value.isoformat()
+                            if hasattr(value, 'isoformat') else value)
+        encoded = urlsafe_b64encode(
+            json.dumps({'p': position, 'r': reverse}).encode()
+        ).decode('ascii')
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
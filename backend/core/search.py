@@ -0,0 +1,169 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import chain
+from typing import (Dict, Generic, Iterable, List, Optional, Set, Tuple,
+                    TypeVar)
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connections
+from django.db.models import Case, IntegerField, Value, When
+
+from core.cache import get_table_versions
+
+T = TypeVar('T')
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class PrefixIndex(Generic[T]):
+    """Поиск по названиям: сначала совпадения по префиксу, потом по подстроке.
+
+    Названия приводятся к casefold и хранятся отсортированным массивом,
+    поэтому префикс находится бинарным поиском, а подстрока -
+    одним проходом по массиву без обращения к БД.
+
+    Params:
+        items (Iterable[Tuple[str, T]]): пары название и значение
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, T]]) -> None:
+        pairs = sorted(((name.casefold(), value) for name, value in items),
+                       key=lambda pair: pair[0])
+        self._keys = [key for key, _ in pairs]
+        self._values = [value for _, value in pairs]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[T]:
+        """Значения, в названии которых есть query.
+
+        Returns:
+            List[T]: совпадения по префиксу, затем по подстроке,
+                внутри групп - по алфавиту, не больше limit.
+        """
+        query = query.casefold()
+        start = end = bisect_left(self._keys, query)
+        while end < len(self._keys) and self._keys[end].startswith(query):
+            end += 1
+        found = self._values[start:end][:limit]
+        if limit is not None and len(found) >= limit:
+            return found
+        for index in chain(range(start), range(end, len(self._keys))):
+            if query in self._keys[index]:
+                found.append(self._values[index])
+                if limit is not None and len(found) >= limit:
+                    break
+        return found
+
+
+def trigrams(text: str) -> Set[str]:
+    """Триграммы текста по правилам pg_trgm.
+
+    Каждое слово приводится к нижнему регистру и дополняется
+    двумя пробелами в начале и одним в конце.
+    """
+    found = set()
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = f'  {word} '
+        found.update(padded[index:index + 3]
+                     for index in range(len(padded) - 2))
+    return found
+
+
+class TrigramIndex(Generic[T]):
+    """Инвертированный индекс триграмм для нечёткого поиска в памяти.
+
+    Замена GIN-индексу pg_trgm для баз без него. Сходство запроса
+    с названием - доля триграмм запроса, найденных в названии,
+    как word_similarity в pg_trgm.
+
+    Params:
+        items (Iterable[Tuple[str, T]]): пары название и значение
+    """
+
+    def __init__(self, items: Iterable[Tuple[str, T]]) -> None:
+        self._values: List[T] = []
+        self._names: List[str] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        for position, (name, value) in enumerate(items):
+            self._values.append(value)
+            self._names.append(name)
+            for trigram in trigrams(name):
+                self._postings[trigram].append(position)
+
+    def search(self, query: str,
+               threshold: float) -> List[Tuple[T, float]]:
+        """Значения со сходством не ниже threshold, лучшие первыми."""
+        query_trigrams = trigrams(query)
+        if not query_trigrams:
+            return []
+        shared: Dict[int, int] = defaultdict(int)
+        for trigram in query_trigrams:
+            for position in self._postings.get(trigram, ()):
+                shared[position] += 1
+        scored = [(count / len(query_trigrams), position)
+                  for position, count in shared.items()
+                  if count / len(query_trigrams) >= threshold]
+        scored.sort(key=lambda item: (-item[0], self._names[item[1]]))
+        return [(self._values[position], score)
+                for score, position in scored]
+
+
+_trigram_indexes: Dict[Tuple[str, str], Tuple[str, TrigramIndex]] = {}
+_trigram_lock = threading.Lock()
+
+
+def get_trigram_index(model, field: str) -> TrigramIndex:
+    """Индекс триграмм поля модели, перестраиваемый при смене версии таблицы.
+
+    Returns:
+        TrigramIndex: индекс pk объектов по значению поля.
+    """
+    table = model._meta.db_table
+    version = get_table_versions((table,))[table]
+    key = (model._meta.label, field)
+    cached = _trigram_indexes.get(key)
+    if cached is None or cached[0] != version:
+        with _trigram_lock:
+            cached = _trigram_indexes.get(key)
+            if cached is None or cached[0] != version:
+                cached = (version, TrigramIndex(
+                    (name, pk) for pk, name in
+                    model.objects.values_list('pk', field).iterator()
+                ))
+                _trigram_indexes[key] = cached
+    return cached[1]
+
+
+def trigram_search(queryset, field: str, value: str):
+    """Нечёткий поиск по полю с сортировкой по сходству.
+
+    В PostgreSQL работает через pg_trgm и GIN-индекс
+    (оператор %> и word_similarity), в остальных базах -
+    через TrigramIndex в памяти процесса. В обоих случаях
+    порог сходства - SEARCH_SIMILARITY_THRESHOLD (для PostgreSQL
+    его задаёт core.signals.set_trigram_threshold).
+    """
+    value = value.strip()
+    if not value:
+        return queryset
+    if connections[queryset.db].vendor == 'postgresql':
+        return (queryset
+                .filter(**{f'{field}__trigram_word_similar': value})
+                .annotate(search_rank=TrigramWordSimilarity(value, field))
+                .order_by('-search_rank', field))
+    found = get_trigram_index(queryset.model, field).search(
+        value, settings.SEARCH_SIMILARITY_THRESHOLD
+    )
+    ranks = {pk: rank for rank, (pk, _) in enumerate(found)}
+    return (queryset.filter(pk__in=ranks)
+            .annotate(search_rank=Case(
+                *(When(pk=pk, then=Value(rank))
+                  for pk, rank in ranks.items()),
+                default=Value(len(ranks)),
+                output_field=IntegerField(),
+            ))
+            .order_by('search_rank'))
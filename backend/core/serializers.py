@@ -10,7 +10,11 @@ class CompactRecipeSerializer(serializers.ModelSerializer):
     Для избранного/списка покупок.
     """
 
-    image = CustomBase64ImageFieldMixin()
+    image = CustomBase64ImageFieldMixin(source='display_image',
+                                        read_only=True)
+    image_renditions = serializers.ReadOnlyField(
+        source='image_rendition_urls'
+    )
 
     class Meta:
         model = Recipe
@@ -18,11 +22,13 @@ class CompactRecipeSerializer(serializers.ModelSerializer):
             'id',
             'name',
             'image',
+            'image_renditions',
             'cooking_time'
         )
         read_only_fields = (
             'id',
             'name',
             'image',
+            'image_renditions',
             'cooking_time'
         )
@@ -1,18 +1,170 @@
 from pathlib import Path
-from django.db.models.signals import post_delete
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from recipes.models import Recipe
+from core.cache import (bump_table_versions, invalidate_all_recipe_fragments,
+                        invalidate_recipe_fragments)
+from recipes.images import rendition_files
+from recipes.models import Ingredient, IngredientQuantity, Recipe, Tag
+from users.models import User
+
+AUTHOR_FRAGMENT_FIELDS = frozenset(
+    ('username', 'first_name', 'last_name', 'email')
+)
 
 
 @receiver(post_delete, sender=Recipe)
 def delete_image(sender: Recipe, instance: Recipe, *args, **kwargs) -> None:
-    """Удаляет картинку при удаление рецепта.
+    """Удаляет картинки при удаление рецепта.
 
     Args:
         sender (Recipe): Модель отправляющая сигнал.
         instance (Recipe): Удалённый рецепт.
     """
-    image = Path(instance.image.path)
-    if image.exists():
-        image.unlink()
+    for field in (instance.image, instance.processed_image):
+        if not field:
+            continue
+        image = Path(field.path)
+        if image.exists():
+            image.unlink()
+    for name in rendition_files(instance.image_renditions):
+        instance.image.storage.delete(name)
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe(sender: Recipe, instance: Recipe,
+                      *args, **kwargs) -> None:
+    """Сбрасывает фрагмент изменённого рецепта.
+
+    Args:
+        sender (Recipe): Модель отправляющая сигнал.
+        instance (Recipe): Изменённый рецепт.
+    """
+    invalidate_recipe_fragments((instance.pk,))
+
+
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_tags(sender, instance, action: str, reverse: bool,
+                           pk_set, *args, **kwargs) -> None:
+    """Сбрасывает фрагменты рецептов при изменении их тегов.
+
+    Args:
+        sender (type): Промежуточная модель тегов рецепта.
+        instance (Recipe | Tag): Сторона связи, которую изменили.
+        action (str): Этап изменения.
+        reverse (bool): Изменение со стороны тега.
+        pk_set (set | None): pk добавленных или удалённых объектов.
+    """
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        invalidate_recipe_fragments((instance.pk,))
+    elif pk_set:
+        invalidate_recipe_fragments(pk_set)
+    else:
+        invalidate_all_recipe_fragments()
+
+
+@receiver(post_save, sender=IngredientQuantity)
+@receiver(post_delete, sender=IngredientQuantity)
+def invalidate_recipe_ingredients(sender: IngredientQuantity,
+                                  instance: IngredientQuantity,
+                                  *args, **kwargs) -> None:
+    """Сбрасывает фрагмент рецепта при изменении его ингредиентов.
+
+    Args:
+        sender (IngredientQuantity): Модель отправляющая сигнал.
+        instance (IngredientQuantity): Изменённое количество ингредиента.
+    """
+    invalidate_recipe_fragments((instance.recipe_id,))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_dictionaries(sender, instance, created: bool = False,
+                            *args, **kwargs) -> None:
+    """Сбрасывает фрагменты всех рецептов при изменении тега или ингредиента.
+
+    Новый тег или ингредиент ещё не входит ни в один рецепт.
+
+    Args:
+        sender (Tag | Ingredient): Модель отправляющая сигнал.
+        instance (Tag | Ingredient): Изменённый объект.
+        created (bool): Объект только что создан.
+    """
+    if not created:
+        invalidate_all_recipe_fragments()
+
+
+@receiver(post_save, sender=User)
+def invalidate_author(sender: User, instance: User, created: bool,
+                      update_fields=None, *args, **kwargs) -> None:
+    """Сбрасывает фрагменты рецептов при изменении данных автора.
+
+    Сохранения, не затрагивающие поля автора во фрагменте
+    (например, last_login при входе), пропускаются.
+
+    Args:
+        sender (User): Модель отправляющая сигнал.
+        instance (User): Изменённый пользователь.
+        created (bool): Пользователь только что создан.
+        update_fields (frozenset | None): Сохранённые поля.
+    """
+    if created or (update_fields is not None
+                   and AUTHOR_FRAGMENT_FIELDS.isdisjoint(update_fields)):
+        return
+    invalidate_all_recipe_fragments()
+
+
+@receiver(post_save)
+@receiver(post_delete)
+def bump_table_version(sender, *args, **kwargs) -> None:
+    """Меняет версию таблицы модели при любой записи в неё.
+
+    Args:
+        sender (type): Модель отправляющая сигнал.
+    """
+    table = sender._meta.db_table
+    transaction.on_commit(lambda: bump_table_versions((table,)))
+
+
+@receiver(m2m_changed)
+def bump_through_table_version(sender, action: str,
+                               *args, **kwargs) -> None:
+    """Меняет версию промежуточной таблицы при изменении связей.
+
+    Args:
+        sender (type): Промежуточная модель связи.
+        action (str): Этап изменения.
+    """
+    if action.startswith('post_'):
+        table = sender._meta.db_table
+        transaction.on_commit(lambda: bump_table_versions((table,)))
+
+
+@receiver(connection_created)
+def set_trigram_threshold(sender, connection, *args, **kwargs) -> None:
+    """Задаёт порог сходства pg_trgm для нового соединения с PostgreSQL.
+
+    Оператор %> в core.search.trigram_search сравнивает сходство
+    с pg_trgm.word_similarity_threshold, поэтому порог из настроек
+    действует и в PostgreSQL, и в поиске в памяти.
+
+    Args:
+        sender (type): Класс соединения.
+        connection (BaseDatabaseWrapper): Новое соединение.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, "
+            "false)",
+            (str(settings.SEARCH_SIMILARITY_THRESHOLD),),
+        )
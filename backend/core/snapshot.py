@@ -0,0 +1,67 @@
+import gzip
+import threading
+from typing import Dict, Optional, Tuple
+
+from rest_framework.renderers import JSONRenderer
+
+from core.cache import get_table_versions
+from core.search import PrefixIndex
+
+
+class ReferenceSnapshot:
+    """Справочник, один раз на процесс отрендеренный в JSON.
+
+    Хранит байты всего списка, его gzip-вариант, байты каждого
+    объекта и, если задано search_field, индекс для поиска по этому
+    полю. Снимок перестраивается при первом обращении после смены
+    версии таблицы модели (её меняют сигналы core.signals).
+
+    Params:
+        model (type): модель справочника
+        serializer_class (type): сериалайзер объекта справочника
+        search_field (str | None): поле для поиска по названию
+    """
+
+    def __init__(self, model, serializer_class,
+                 search_field: Optional[str] = None) -> None:
+        self.model = model
+        self.serializer_class = serializer_class
+        self.search_field = search_field
+        self._lock = threading.Lock()
+        self._state: Tuple[Optional[str], Tuple[bytes, bytes],
+                           Dict[str, bytes], PrefixIndex[bytes]] = (
+            None, (b'', b''), {}, PrefixIndex(())
+        )
+
+    def _current(self):
+        table = self.model._meta.db_table
+        version = get_table_versions((table,))[table]
+        if self._state[0] == version:
+            return self._state
+        with self._lock:
+            if self._state[0] != version:
+                renderer = JSONRenderer()
+                data = self.serializer_class(self.model.objects.all(),
+                                             many=True).data
+                content = renderer.render(data)
+                items = {str(item['id']): renderer.render(item)
+                         for item in data}
+                index = PrefixIndex(
+                    (item[self.search_field], items[str(item['id'])])
+                    for item in data
+                ) if self.search_field else PrefixIndex(())
+                self._state = (version, (content, gzip.compress(content)),
+                               items, index)
+        return self._state
+
+    def get_list(self) -> Tuple[bytes, bytes]:
+        """JSON всего справочника и он же в gzip."""
+        return self._current()[1]
+
+    def get_item(self, pk: str) -> Optional[bytes]:
+        """JSON объекта справочника или None, если его нет."""
+        return self._current()[2].get(str(pk))
+
+    def search(self, query: str, limit: Optional[int] = None) -> bytes:
+        """JSON-список объектов, найденных по search_field."""
+        return b'[' + b','.join(self._current()[3].search(query, limit)) + b']'
@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+
+@contextmanager
+def assert_max_queries(limit, using=DEFAULT_DB_ALIAS):
+    """Проверить, что в блоке выполнено не больше limit SQL-запросов.
+
+    В отличие от assertNumQueries не требует точного числа,
+    поэтому не ломается от оптимизаций, но ловит N+1.
+
+    Raises:
+        AssertionError: если лимит превышен, со списком запросов.
+    """
+    with CaptureQueriesContext(connections[using]) as context:
+        yield context
+    executed = len(context.captured_queries)
+    if executed > limit:
+        queries = '\n'.join(
+            f'{number}. {query["sql"]}'
+            for number, query in enumerate(context.captured_queries, 1)
+        )
+        raise AssertionError(
+            f'Выполнено {executed} SQL-запросов при лимите {limit}:\n'
+            f'{queries}'
+        )
+
+
+class QueryBudgetMixin:
+    """Миксин для TestCase с проверкой лимитов из settings.QUERY_BUDGETS.
+
+    Пример:
+        response = self.assert_query_budget(
+            'GET api:recipes-list', self.client.get, '/api/recipes/'
+        )
+    """
+
+    def assert_query_budget(self, view_name, method, *args, **kwargs):
+        """Выполнить запрос, уложившись в лимит для "<метод> <view>"."""
+        with assert_max_queries(settings.QUERY_BUDGETS[view_name]):
+            return method(*args, **kwargs)
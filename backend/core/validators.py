@@ -1,12 +1,6 @@
 from rest_framework.serializers import ValidationError
-from django.conf import settings
 
-from recipes.models import Tag
-from obsceneLang.utils import (
-    get_words_from_text,
-    get_forbidden_words,
-    text_has_forbidden_words
-)
+from recipes.models import Ingredient, Tag
 
 
 def validate_tags(value):
@@ -23,16 +17,22 @@ def validate_tags(value):
         raise ValidationError(
             {'tags': ['Хотя бы один тег должен быть указан.']}
         )
-    for tag in value:
-        if not Tag.objects.filter(id=tag).exists():
-            raise ValidationError(
-                {'tags': ['Тег несуществует.']}
-            )
-    return value
+    tags = Tag.objects.in_bulk(value)
+    if len(tags) != len(value):
+        raise ValidationError(
+            {'tags': ['Тег несуществует.']}
+        )
+    return list(tags.values())
 
 
 def validate_ingredients(ingredients):
-    """Валидация ингредиентов."""
+    """Валидация ингредиентов.
+
+    Все ингредиенты загружаются одним запросом.
+
+    Returns:
+        list[dict]: ингредиент (Ingredient) и количество (amount).
+    """
     if not ingredients:
         raise ValidationError(
             {'ingredients': ['Обязательное поле.']}
@@ -43,7 +43,14 @@ def validate_ingredients(ingredients):
         if id in unique_ingredients:
             raise ValidationError("Ингредиенты должны быть уникальными.")
         unique_ingredients.add(id)
-    return ingredients
+    found = Ingredient.objects.in_bulk(unique_ingredients)
+    missing = sorted(unique_ingredients - set(found))
+    if missing:
+        raise ValidationError(
+            {'ingredients': [f'Ингредиента не существует: {missing}.']}
+        )
+    return [{'ingredient': found[item['id']], 'amount': item['amount']}
+            for item in ingredients]
 
 
 class ValidateRecipeMixin():
@@ -63,16 +70,6 @@ class ValidateRecipeMixin():
             raise ValidationError(
                 {'ingredients': ['Обязательное поле.']}
             )
-        forbidden_words = get_forbidden_words()
-        text_words = get_words_from_text(value)
-        if text_has_forbidden_words(text_words,
-                                    forbidden_words,
-                                    settings.THRESHOLD):
-            raise ValidationError(
-                ("Использование запрещенных слов не допустимо. "
-                 "Ну и ну, вы разочаровали партию. "
-                 "-10000 социального рейтинга ☹️📉👎.")
-            )
         return value
 
     def validate_cooking_time(self, value):
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import ForbiddenWord
+from .models import ForbiddenWord, RescanCheckpoint
 
 
 class ForbiddenWordAdmin(admin.ModelAdmin):
@@ -16,4 +16,18 @@ class ForbiddenWordAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+class RescanCheckpointAdmin(admin.ModelAdmin):
+    """ Интерфейс администратора для прогресса перепроверки. """
+
+    list_display = (
+        'pk',
+        'target',
+        'word_id',
+        'pending_word_id',
+        'last_pk',
+    )
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(ForbiddenWord, ForbiddenWordAdmin)
+admin.site.register(RescanCheckpoint, RescanCheckpointAdmin)
@@ -0,0 +1,80 @@
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+class AhoCorasick:
+    """Автомат Ахо-Корасик для поиска слов словаря внутри текста.
+
+    Автомат строится один раз, после чего все вхождения всех слов
+    находятся за один линейный проход по тексту, в том числе слова,
+    приклеенные к знакам препинания или спрятанные внутри других слов.
+
+    Params:
+        words (Iterable[str]): слова словаря
+    """
+
+    def __init__(self, words: Iterable[str]) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+        for word in words:
+            if word:
+                self._add(word)
+        self._build_failure_links()
+
+    def __bool__(self) -> bool:
+        return len(self._goto) > 1
+
+    def _add(self, word: str) -> None:
+        node = 0
+        for char in word:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            node = next_node
+        self._output[node] += (word,)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._output[child] += self._output[self._fail[child]]
+
+    def _step(self, node: int, char: str) -> int:
+        while node and char not in self._goto[node]:
+            node = self._fail[node]
+        return self._goto[node].get(char, 0)
+
+    def find_all(self, text: str) -> List[Tuple[int, str]]:
+        """Все вхождения слов словаря в текст.
+
+        Returns:
+            List[Tuple[int, str]]: позиция начала и найденное слово.
+        """
+        found = []
+        node = 0
+        for position, char in enumerate(text):
+            node = self._step(node, char)
+            for word in self._output[node]:
+                found.append((position - len(word) + 1, word))
+        return found
+
+    def has_match(self, text: str) -> bool:
+        """Есть ли в тексте хотя бы одно слово словаря."""
+        node = 0
+        for char in text:
+            node = self._step(node, char)
+            if self._output[node]:
+                return True
+        return False
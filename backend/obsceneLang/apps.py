@@ -7,3 +7,6 @@ class ObscenelangConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'obsceneLang'
     verbose_name = 'Запрещённые слова'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -0,0 +1,81 @@
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from Levenshtein import distance
+
+Node = Tuple[str, Dict[int, 'Node']]
+
+
+class BKTree:
+    """BK-дерево для поиска слов по расстоянию Левенштейна.
+
+    Расстояние Левенштейна - метрика, поэтому при поиске слов
+    в пределах порога достаточно обойти только тех потомков узла,
+    чьё расстояние до узла лежит в [d - threshold, d + threshold].
+
+    Params:
+        words (Iterable[str]): слова словаря
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._root: Optional[Node] = None
+        self._size = 0
+        self.min_length = 0
+        self.max_length = 0
+        for word in words:
+            self.add(word)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            node_word, children = stack.pop()
+            yield node_word
+            stack.extend(children.values())
+
+    def add(self, word: str) -> None:
+        """Добавить слово в дерево."""
+        if self._root is None:
+            self._root = (word, {})
+            self._update_bounds(word)
+            return
+        node_word, children = self._root
+        while True:
+            word_distance = distance(word, node_word)
+            if word_distance == 0:
+                return
+            child = children.get(word_distance)
+            if child is None:
+                children[word_distance] = (word, {})
+                self._update_bounds(word)
+                return
+            node_word, children = child
+
+    def has_within(self, word: str, threshold: int) -> bool:
+        """Есть ли в дереве слово на расстоянии не больше threshold."""
+        if self._root is None:
+            return False
+        if (len(word) > self.max_length + threshold
+                or len(word) + threshold < self.min_length):
+            return False
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            word_distance = distance(word, node_word)
+            if word_distance <= threshold:
+                return True
+            for child_distance in range(max(word_distance - threshold, 1),
+                                        word_distance + threshold + 1):
+                child = children.get(child_distance)
+                if child is not None:
+                    stack.append(child)
+        return False
+
+    def _update_bounds(self, word: str) -> None:
+        length = len(word)
+        if not self._size or length < self.min_length:
+            self.min_length = length
+        if length > self.max_length:
+            self.max_length = length
+        self._size += 1
@@ -0,0 +1,58 @@
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+from rapidfuzz import process
+from rapidfuzz.distance import Levenshtein
+
+
+def bucket_has_within(word: str,
+                      candidates: Sequence[str],
+                      threshold: int) -> bool:
+    """Есть ли среди кандидатов слово на расстоянии не больше threshold.
+
+    Перебор идёт внутри rapidfuzz, без цикла на Python.
+    """
+    return process.extractOne(word, candidates,
+                              scorer=Levenshtein.distance,
+                              score_cutoff=threshold) is not None
+
+
+class LengthBucketIndex:
+    """Словарь запрещённых слов, разбитый на корзины по длине слова.
+
+    Слова, длина которых отличается от длины проверяемого слова
+    больше чем на порог, не могут быть к нему ближе порога,
+    поэтому проверяются только соседние корзины.
+
+    Params:
+        words (Iterable[str]): слова словаря
+    """
+
+    def __init__(self, words: Iterable[str] = ()) -> None:
+        self._words = frozenset(words)
+        self._buckets: Dict[int, List[str]] = {}
+        for word in sorted(self._words):
+            self._buckets.setdefault(len(word), []).append(word)
+        self.min_length = min(self._buckets, default=0)
+        self.max_length = max(self._buckets, default=0)
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._words)
+
+    def contains(self, word: str) -> bool:
+        """Есть ли слово в словаре."""
+        return word in self._words
+
+    def has_within(self, word: str, threshold: int) -> bool:
+        """Есть ли в словаре слово на расстоянии не больше threshold."""
+        if word in self._words:
+            return True
+        length = len(word)
+        return any(
+            bucket_has_within(word, self._buckets[bucket_length], threshold)
+            for bucket_length in range(length - threshold,
+                                       length + threshold + 1)
+            if bucket_length in self._buckets
+        )
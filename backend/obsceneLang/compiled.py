@@ -0,0 +1,155 @@
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left
+from typing import Iterable, Iterator, List, Tuple
+
+from .buckets import bucket_has_within
+
+MAGIC = b'FGFW'
+FORMAT_VERSION = 1
+ENCODING = 'utf-32-be'
+CHAR_SIZE = 4
+
+HEADER = struct.Struct('<4sII')
+BUCKET = struct.Struct('<QI')
+
+
+def compile_dictionary(words: Iterable[str], path: str) -> int:
+    """Записать словарь в компактный файл для отображения в память.
+
+    Формат файла: заголовок, таблица корзин по длине слова
+    (смещение, количество слов) и сами корзины. Слова одной длины
+    отсортированы и лежат подряд в UTF-32-BE, поэтому к любому слову
+    можно обратиться по индексу, а сравнение байтов совпадает
+    со сравнением строк. Файл заменяется атомарно, так что воркеры,
+    уже отобразившие прежнюю версию, продолжают с ней работать.
+
+    Returns:
+        int: количество записанных слов.
+    """
+    unique_words = {word for word in words if word}
+    max_length = max(map(len, unique_words), default=0)
+    buckets: List[List[str]] = [[] for _ in range(max_length + 1)]
+    for word in unique_words:
+        buckets[len(word)].append(word)
+
+    offset = HEADER.size + BUCKET.size * len(buckets)
+    table, data = [], []
+    for length, bucket in enumerate(buckets):
+        bucket.sort()
+        table.append(BUCKET.pack(offset, len(bucket)))
+        data.append(''.join(bucket).encode(ENCODING))
+        offset += len(bucket) * length * CHAR_SIZE
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(buckets)))
+            file.writelines(table)
+            file.writelines(data)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return len(unique_words)
+
+
+class CompiledDictionary:
+    """Словарь запрещённых слов, отображённый в память только для чтения.
+
+    Все воркеры, открывшие один и тот же файл, разделяют его страницы.
+    Поиск идёт напрямую по отображённым данным: точное совпадение -
+    бинарным поиском в корзине той же длины, нечёткое - только
+    по корзинам, длина слов в которых отличается не больше чем
+    на порог. Корзина декодируется на время запроса и в памяти
+    процесса не хранится.
+
+    Params:
+        path (str): путь к файлу, созданному compile_dictionary
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0,
+                                     access=mmap.ACCESS_READ)
+        magic, version, bucket_count = HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._buffer.close()
+            raise ValueError(f'{path} не является словарём версии '
+                             f'{FORMAT_VERSION}.')
+        self._buckets: List[Tuple[int, int]] = [
+            BUCKET.unpack_from(self._buffer,
+                               HEADER.size + BUCKET.size * length)
+            for length in range(bucket_count)
+        ]
+        lengths = [length for length, (_, count) in enumerate(self._buckets)
+                   if count]
+        self.min_length = min(lengths, default=0)
+        self.max_length = max(lengths, default=0)
+        self._size = sum(count for _, count in self._buckets)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[str]:
+        for length in range(self.min_length, self.max_length + 1):
+            yield from self._bucket_words(length)
+
+    def contains(self, word: str) -> bool:
+        """Есть ли слово в словаре."""
+        length = len(word)
+        if not length or length > self.max_length:
+            return False
+        offset, count = self._buckets[length]
+        stride = length * CHAR_SIZE
+        encoded = word.encode(ENCODING)
+        keys = _BucketKeys(self._buffer, offset, stride, count)
+        index = bisect_left(keys, encoded)
+        return index < count and keys[index] == encoded
+
+    def has_within(self, word: str, threshold: int) -> bool:
+        """Есть ли в словаре слово на расстоянии не больше threshold."""
+        if not self._size:
+            return False
+        if self.contains(word):
+            return True
+        length = len(word)
+        for bucket_length in range(max(length - threshold, self.min_length),
+                                   min(length + threshold,
+                                       self.max_length) + 1):
+            candidates = self._bucket_words(bucket_length)
+            if candidates and bucket_has_within(word, candidates, threshold):
+                return True
+        return False
+
+    def _bucket_words(self, length: int) -> List[str]:
+        if not length:
+            return []
+        offset, count = self._buckets[length]
+        stride = length * CHAR_SIZE
+        chars = self._buffer[offset:offset + stride * count].decode(ENCODING)
+        return [chars[start:start + length]
+                for start in range(0, len(chars), length)]
+
+
+class _BucketKeys:
+    """Последовательность закодированных слов корзины для bisect."""
+
+    def __init__(self, buffer: mmap.mmap,
+                 offset: int, stride: int, count: int) -> None:
+        self._buffer = buffer
+        self._offset = offset
+        self._stride = stride
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> bytes:
+        start = self._offset + index * self._stride
+        return self._buffer[start:start + self._stride]
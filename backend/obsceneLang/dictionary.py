@@ -0,0 +1,166 @@
+import os
+from contextlib import contextmanager
+from functools import cached_property
+from threading import Lock
+from typing import Dict, Iterable, Iterator, Optional, Union
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .aho_corasick import AhoCorasick
+from .buckets import LengthBucketIndex
+from .compiled import CompiledDictionary, compile_dictionary
+from .utils import (get_forbidden_words, get_tokens_from_value,
+                    verdict_cache)
+
+VERSION_CACHE_KEY = 'obsceneLang:forbidden_words:version'
+MATCH_MODE_WORD = 'word'
+MATCH_MODE_SUBSTRING = 'substring'
+
+ForbiddenIndex = Union[LengthBucketIndex, CompiledDictionary]
+
+
+class ForbiddenDictionary:
+    """Загруженный в память словарь запрещённых слов.
+
+    Params:
+        index (ForbiddenIndex): индекс для поиска слов
+        version (str): версия словаря, из которой он загружен
+    """
+
+    def __init__(self, index: ForbiddenIndex, version: str) -> None:
+        self.index = index
+        self.version = version
+
+    @property
+    def words(self) -> Iterator[str]:
+        """Слова словаря."""
+        return iter(self.index)
+
+    @cached_property
+    def automaton(self) -> AhoCorasick:
+        """Автомат для поиска слов внутри текста, строится один раз."""
+        return AhoCorasick(self.words)
+
+    def is_forbidden(self, word: str, threshold: int) -> bool:
+        """Проверка слова по индексу словаря с кэшированием вердикта.
+
+        Токен длиннее самого длинного слова словаря больше чем
+        на порог не может быть к нему ближе порога. Он не проверяется
+        и не попадает в кэш: это, например, целые тексты рецептов.
+        """
+        if len(word) > self.index.max_length + threshold:
+            return False
+        return verdict_cache.get_verdict(
+            self.version,
+            (word, threshold),
+            lambda: self.index.has_within(word, threshold),
+        )
+
+    def check_fields(self,
+                     fields: Dict[str, str],
+                     threshold: int,
+                     mode: str = MATCH_MODE_WORD) -> Dict[str, bool]:
+        """Проверить несколько полей за один проход по словарю.
+
+        Каждый уникальный токен всех полей проверяется один раз.
+        В режиме substring дополнительно ищутся точные вхождения
+        слов словаря внутри текста полей.
+
+        Returns:
+            Dict[str, bool]: для каждого поля - есть ли в нём
+                запрещённые слова.
+        """
+        field_tokens = {
+            field: get_tokens_from_value(value)
+            for field, value in fields.items()
+        }
+        verdicts = {
+            token: self.is_forbidden(token, threshold)
+            for token in set().union(*field_tokens.values())
+        }
+        result = {
+            field: any(verdicts[token] for token in tokens)
+            for field, tokens in field_tokens.items()
+        }
+        if mode == MATCH_MODE_SUBSTRING:
+            for field, value in fields.items():
+                if not result[field]:
+                    result[field] = self.automaton.has_match(value.lower())
+        return result
+
+
+_lock = Lock()
+_dictionary: Optional[ForbiddenDictionary] = None
+_override: Optional[ForbiddenDictionary] = None
+
+
+def get_dictionary_version() -> str:
+    """Текущая версия словаря, общая для всех процессов."""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        cache.add(VERSION_CACHE_KEY, uuid4().hex, None)
+        version = cache.get(VERSION_CACHE_KEY)
+    return version
+
+
+def bump_dictionary_version() -> None:
+    """Пометить словарь изменённым во всех процессах."""
+    cache.set(VERSION_CACHE_KEY, uuid4().hex, None)
+
+
+def compile_forbidden_words(path: Optional[str] = None) -> int:
+    """Скомпилировать таблицу ForbiddenWord в файл для отображения в память.
+
+    Returns:
+        int: количество записанных слов.
+    """
+    return compile_dictionary(get_forbidden_words(),
+                              path or settings.FORBIDDEN_WORDS_COMPILED_PATH)
+
+
+def refresh_dictionary() -> None:
+    """Пересобрать файл словаря, если он используется, и сменить версию."""
+    if settings.FORBIDDEN_WORDS_COMPILED_PATH:
+        compile_forbidden_words()
+    bump_dictionary_version()
+
+
+def load_forbidden_index() -> ForbiddenIndex:
+    """Загрузить индекс из скомпилированного файла или из базы данных."""
+    path = settings.FORBIDDEN_WORDS_COMPILED_PATH
+    if path and os.path.exists(path):
+        return CompiledDictionary(path)
+    return LengthBucketIndex(get_forbidden_words())
+
+
+def get_forbidden_dictionary() -> ForbiddenDictionary:
+    """Получить словарь процесса, перечитав его при смене версии."""
+    global _dictionary
+    if _override is not None:
+        return _override
+    version = get_dictionary_version()
+    dictionary = _dictionary
+    if dictionary is not None and dictionary.version == version:
+        return dictionary
+    with _lock:
+        if _dictionary is None or _dictionary.version != version:
+            _dictionary = ForbiddenDictionary(load_forbidden_index(), version)
+        return _dictionary
+
+
+@contextmanager
+def override_forbidden_words(words: Iterable[str]):
+    """Подменить словарь процесса словарём в памяти.
+
+    Позволяет проверять и замерять валидаторы без базы данных.
+    """
+    global _override
+    previous = _override
+    _override = ForbiddenDictionary(LengthBucketIndex(words),
+                                    f'override:{uuid4().hex}')
+    try:
+        yield _override
+    finally:
+        _override = previous
@@ -0,0 +1,229 @@
+import json
+import os
+import platform
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.management import BaseCommand
+from django.test.utils import override_settings
+
+from obsceneLang.bktree import BKTree
+from obsceneLang.buckets import LengthBucketIndex
+from obsceneLang.compiled import CompiledDictionary, compile_dictionary
+from obsceneLang.dictionary import (MATCH_MODE_WORD,
+                                    override_forbidden_words)
+from obsceneLang.utils import (get_words_from_text,
+                               index_has_forbidden_words,
+                               text_has_forbidden_words, verdict_cache)
+from obsceneLang.validators import validate_no_obscenities
+
+ALPHABET = 'абвгдеёжзийклмнопрстуфхцчшщъыьэюя'
+VOCABULARY_SIZE = 500
+
+
+def random_word(rnd, min_length=3, max_length=12):
+    """Случайное слово из кириллицы."""
+    return ''.join(rnd.choice(ALPHABET)
+                   for _ in range(rnd.randint(min_length, max_length)))
+
+
+def generate_dictionary(rnd, size):
+    """Синтетический словарь запрещённых слов."""
+    words = set()
+    while len(words) < size:
+        words.add(random_word(rnd, 4, 12))
+    return sorted(words)
+
+
+def generate_texts(rnd, dictionary, count, length, hit_ratio):
+    """Синтетические тексты рецептов с повторяющейся лексикой.
+
+    Доля hit_ratio текстов содержит слово из словаря.
+    """
+    vocabulary = [random_word(rnd) for _ in range(VOCABULARY_SIZE)]
+    texts = []
+    for _ in range(count):
+        words = rnd.choices(vocabulary, k=length)
+        if rnd.random() < hit_ratio:
+            words[rnd.randrange(length)] = rnd.choice(dictionary)
+        texts.append(' '.join(words))
+    return texts
+
+
+def percentile(sorted_values, fraction):
+    """Перцентиль по отсортированной выборке."""
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark forbidden-word matching on synthetic data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes',
+                            type=str,
+                            default='100,1000,10000,50000',
+                            help='Comma-separated dictionary sizes')
+        parser.add_argument('--text-lengths',
+                            type=str,
+                            default='20,200',
+                            help='Comma-separated words per recipe text')
+        parser.add_argument('--samples',
+                            type=int,
+                            default=200,
+                            help='Texts per measurement')
+        parser.add_argument('--hit-ratio',
+                            type=float,
+                            default=0.1,
+                            help='Share of texts with a forbidden word')
+        parser.add_argument('--brute-force-max-size',
+                            type=int,
+                            default=5000,
+                            help='Skip brute force above this size')
+        parser.add_argument('--threshold',
+                            type=int,
+                            default=settings.THRESHOLD,
+                            help='Levenshtein threshold')
+        parser.add_argument('--seed',
+                            type=int,
+                            default=0,
+                            help='Random seed')
+        parser.add_argument('--output',
+                            type=str,
+                            help='Path to the JSON report')
+
+    def handle(self, *args, **options):
+        rnd = random.Random(options['seed'])
+        threshold = options['threshold']
+        results = []
+        for size in map(int, options['sizes'].split(',')):
+            dictionary = generate_dictionary(rnd, size)
+            for length in map(int, options['text_lengths'].split(',')):
+                texts = generate_texts(rnd, dictionary, options['samples'],
+                                       length, options['hit_ratio'])
+                results.extend(self.run_case(
+                    dictionary, texts, threshold,
+                    size <= options['brute_force_max_size'],
+                ))
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'threshold': threshold,
+                'samples': options['samples'],
+                'hit_ratio': options['hit_ratio'],
+                'seed': options['seed'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+            self.stdout.write(
+                self.style.SUCCESS(f'Report written to {options["output"]}')
+            )
+
+    def run_case(self, dictionary, texts, threshold, with_brute_force):
+        """Замерить все реализации на одном словаре и наборе текстов."""
+        forbidden_words = set(dictionary)
+        tree = BKTree(dictionary)
+        buckets = LengthBucketIndex(dictionary)
+        fd, path = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        try:
+            compile_dictionary(dictionary, path)
+            compiled = CompiledDictionary(path)
+            implementations = {
+                'bktree': lambda text: index_has_forbidden_words(
+                    get_words_from_text(text), tree, threshold),
+                'buckets': lambda text: index_has_forbidden_words(
+                    get_words_from_text(text), buckets, threshold),
+                'compiled': lambda text: index_has_forbidden_words(
+                    get_words_from_text(text), compiled, threshold),
+            }
+            if with_brute_force:
+                implementations['text_has_forbidden_words'] = (
+                    lambda text: text_has_forbidden_words(
+                        get_words_from_text(text), forbidden_words,
+                        threshold)
+                )
+            # Валидатор берёт порог и режим из настроек,
+            # поэтому на время замера они подменяются параметрами.
+            with override_settings(
+                THRESHOLD=threshold,
+                FORBIDDEN_WORDS_MATCH_MODE=MATCH_MODE_WORD,
+            ), override_forbidden_words(dictionary) as cached:
+                implementations['validate_no_obscenities'] = (
+                    self.validator_verdict
+                )
+                implementations['cached'] = (
+                    lambda text: cached.check_fields(
+                        {'text': text}, threshold, MATCH_MODE_WORD)['text']
+                )
+                return self.measure(implementations, texts,
+                                    len(dictionary))
+        finally:
+            os.unlink(path)
+
+    @staticmethod
+    def validator_verdict(text):
+        try:
+            validate_no_obscenities(text)
+        except ValidationError:
+            return True
+        return False
+
+    def measure(self, implementations, texts, size):
+        """Прогнать тексты через реализации и посчитать метрики."""
+        word_count = sum(len(text.split()) for text in texts)
+        verdicts = {}
+        results = []
+        for name, check in implementations.items():
+            # Валидатор замеряется с холодного кэша вердиктов,
+            # cached - после прогрева тем же набором текстов.
+            verdict_cache.clear()
+            if name == 'cached':
+                for text in texts:
+                    check(text)
+            latencies = []
+            verdicts[name] = []
+            for text in texts:
+                started = time.perf_counter()
+                verdicts[name].append(bool(check(text)))
+                latencies.append(time.perf_counter() - started)
+            latencies.sort()
+            total = sum(latencies)
+            results.append({
+                'implementation': name,
+                'dictionary_size': size,
+                'text_words': word_count // len(texts),
+                'words_per_sec': round(word_count / total, 1),
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 4),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 4),
+            })
+
+        reference = verdicts.get('text_has_forbidden_words',
+                                 verdicts['bktree'])
+        cache_info = verdict_cache.info()
+        for result in results:
+            if result['implementation'] == 'cached':
+                result['verdict_cache'] = cache_info
+            result['mismatches'] = sum(
+                verdict != expected for verdict, expected in
+                zip(verdicts[result['implementation']], reference)
+            )
+            line = (f'{result["implementation"]:>24} '
+                    f'size={size:<6} words={result["text_words"]:<5} '
+                    f'{result["words_per_sec"]:>12} w/s  '
+                    f'p50={result["p50_ms"]}ms p99={result["p99_ms"]}ms  '
+                    f'mismatches={result["mismatches"]}')
+            style = (self.style.ERROR if result['mismatches']
+                     else self.style.SUCCESS)
+            self.stdout.write(style(line))
+        return results
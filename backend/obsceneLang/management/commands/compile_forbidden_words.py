@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+from obsceneLang.dictionary import (bump_dictionary_version,
+                                    compile_forbidden_words)
+
+
+class Command(BaseCommand):
+    help = 'Compile forbidden words into a memory-mapped dictionary file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output',
+                            type=str,
+                            help='Path to the compiled dictionary file')
+
+    def handle(self, *args, **options):
+        path = options['output'] or settings.FORBIDDEN_WORDS_COMPILED_PATH
+        if not path:
+            raise CommandError(
+                'Set FORBIDDEN_WORDS_COMPILED_PATH or pass --output.'
+            )
+        count = compile_forbidden_words(path)
+        bump_dictionary_version()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Compiled {count} forbidden words into {path}'
+            )
+        )
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.6 on 2026-10-18 03:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('obsceneLang', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RescanCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('target', models.CharField(max_length=100, unique=True, verbose_name='Проверяемая модель')),
+                ('word_id', models.PositiveBigIntegerField(default=0, verbose_name='Проверено до слова')),
+                ('pending_word_id', models.PositiveBigIntegerField(blank=True, null=True, verbose_name='Текущий проход до слова')),
+                ('last_pk', models.PositiveBigIntegerField(default=0, verbose_name='Последний проверенный pk')),
+            ],
+            options={
+                'verbose_name': 'Прогресс перепроверки',
+                'verbose_name_plural': 'Прогресс перепроверки',
+            },
+        ),
+    ]
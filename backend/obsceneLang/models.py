@@ -24,3 +24,32 @@ class ForbiddenWord(models.Model):
         """Валидация поля word."""
         self.word = self.word.lower()
         return super().clean(*args, **kwargs)
+
+
+class RescanCheckpoint(models.Model):
+    """Модель для хранения прогресса перепроверки контента.
+
+    Params:
+        target (str): проверяемая модель в формате app_label.Model
+        word_id (int): слова с id не больше этого уже проверены
+        pending_word_id (int): верхняя граница id слов текущего прохода
+        last_pk (int): последний проверенный pk текущего прохода
+    """
+
+    target = models.CharField('Проверяемая модель',
+                              max_length=settings.TARGET_MAX_LENGTH,
+                              unique=True)
+    word_id = models.PositiveBigIntegerField('Проверено до слова',
+                                             default=0)
+    pending_word_id = models.PositiveBigIntegerField('Текущий проход до слова',
+                                                     null=True,
+                                                     blank=True)
+    last_pk = models.PositiveBigIntegerField('Последний проверенный pk',
+                                             default=0)
+
+    class Meta:
+        verbose_name = 'Прогресс перепроверки'
+        verbose_name_plural = 'Прогресс перепроверки'
+
+    def __str__(self) -> str:
+        return self.target
@@ -0,0 +1,20 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .dictionary import refresh_dictionary
+from .models import ForbiddenWord
+
+
+@receiver(post_save, sender=ForbiddenWord)
+@receiver(post_delete, sender=ForbiddenWord)
+def invalidate_dictionary(sender: ForbiddenWord,
+                          instance: ForbiddenWord,
+                          *args, **kwargs) -> None:
+    """Сбрасывает словарь запрещённых слов во всех процессах.
+
+    Args:
+        sender (ForbiddenWord): Модель отправляющая сигнал.
+        instance (ForbiddenWord): Изменённое слово.
+    """
+    transaction.on_commit(refresh_dictionary)
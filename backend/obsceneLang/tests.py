@@ -0,0 +1,81 @@
+import os
+import random
+import tempfile
+
+from django.test import SimpleTestCase
+
+from .bktree import BKTree
+from .buckets import LengthBucketIndex
+from .compiled import CompiledDictionary, compile_dictionary
+from .dictionary import override_forbidden_words
+from .utils import is_forbidden, verdict_cache
+
+ALPHABET = 'абвгдеклмно'
+THRESHOLDS = (0, 1, 2, 3)
+
+
+def random_word(rng: random.Random, max_length: int = 8) -> str:
+    return ''.join(rng.choice(ALPHABET)
+                   for _ in range(rng.randint(1, max_length)))
+
+
+class ForbiddenIndexEquivalenceTest(SimpleTestCase):
+    """Индексы словаря дают те же вердикты, что и перебор is_forbidden."""
+
+    dictionaries = 20
+    queries = 200
+
+    def setUp(self):
+        self.rng = random.Random(20231018)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def make_indexes(self, words, number):
+        path = os.path.join(self.tmp.name, f'forbidden_{number}.bin')
+        compile_dictionary(words, path)
+        return {
+            'BKTree': BKTree(words),
+            'LengthBucketIndex': LengthBucketIndex(words),
+            'CompiledDictionary': CompiledDictionary(path),
+        }
+
+    def test_indexes_match_is_forbidden(self):
+        for number in range(self.dictionaries):
+            words = {random_word(self.rng)
+                     for _ in range(self.rng.randint(1, 60))}
+            indexes = self.make_indexes(words, number)
+            queries = [random_word(self.rng, 10)
+                       for _ in range(self.queries)]
+            queries.extend(self.rng.sample(sorted(words), min(10, len(words))))
+            for word in queries:
+                for threshold in THRESHOLDS:
+                    expected = is_forbidden(word, words, threshold)
+                    for name, index in indexes.items():
+                        with self.subTest(index=name, word=word,
+                                          threshold=threshold):
+                            self.assertEqual(
+                                index.has_within(word, threshold), expected
+                            )
+
+    def test_empty_dictionary(self):
+        for name, index in self.make_indexes(set(), 'empty').items():
+            for threshold in THRESHOLDS:
+                with self.subTest(index=name, threshold=threshold):
+                    self.assertFalse(index.has_within('слово', threshold))
+
+
+class VerdictCacheTest(SimpleTestCase):
+    """Длинные токены не попадают в кэш вердиктов."""
+
+    def setUp(self):
+        verdict_cache.clear()
+        self.addCleanup(verdict_cache.clear)
+
+    def test_long_values_are_not_cached(self):
+        text = ' '.join(['слово'] * 50)
+        with override_forbidden_words({'плохо', 'хуже'}) as dictionary:
+            self.assertEqual(
+                dictionary.check_fields({'text': text, 'name': 'плохо'}, 1),
+                {'text': False, 'name': True},
+            )
+        self.assertEqual(verdict_cache.info()['size'], 2)
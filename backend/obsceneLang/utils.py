@@ -1,9 +1,20 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Dict, Hashable, Protocol, Set
+
+from django.conf import settings
 from Levenshtein import distance
-from typing import Set
 
 from .models import ForbiddenWord
 
 
+class WordIndex(Protocol):
+    """Индекс слов с поиском по расстоянию Левенштейна."""
+
+    def has_within(self, word: str, threshold: int) -> bool:
+        """Есть ли слово на расстоянии не больше threshold."""
+
+
 def get_forbidden_words() -> Set[str]:
     """Получить множество нецензурных слов."""
     forbidden_words = ({w.lower() for w in
@@ -16,6 +27,17 @@ def get_words_from_text(text_string: str) -> Set[str]:
     return {w for w in text_string.lower().split()}
 
 
+def get_tokens_from_value(value: str) -> Set[str]:
+    """Получить множество проверяемых токенов значения поля.
+
+    Помимо отдельных слов проверяется и значение целиком.
+    """
+    tokens = get_words_from_text(value)
+    tokens.add(value.lower())
+    tokens.discard('')
+    return tokens
+
+
 def is_forbidden(word: str, forbidden_words: Set[str], threshold: int):
     """Проверка слова с помощью расстояния Левенштейна."""
     return any(
@@ -32,3 +54,70 @@ def text_has_forbidden_words(set_string: Set[str],
         is_forbidden(word, forbidden_words_set, threshold)
         for word in set_string
     )
+
+
+def index_has_forbidden_words(set_string: Set[str],
+                              index: WordIndex,
+                              threshold: int) -> bool:
+    """Проверка текста по индексу нецензурных слов."""
+    return any(index.has_within(word, threshold) for word in set_string)
+
+
+class TokenVerdictCache:
+    """Ограниченный LRU-кэш вердиктов проверки слов.
+
+    Кэш привязан к версии словаря: при смене версии
+    все сохранённые вердикты сбрасываются.
+
+    Params:
+        maxsize (int): максимальное количество вердиктов
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._version: Hashable = None
+        self._verdicts: 'OrderedDict[Hashable, bool]' = OrderedDict()
+        self._lock = Lock()
+
+    def get_verdict(self,
+                    version: Hashable,
+                    key: Hashable,
+                    compute: Callable[[], bool]) -> bool:
+        """Получить вердикт из кэша или вычислить и сохранить его."""
+        with self._lock:
+            if version != self._version:
+                self._verdicts.clear()
+                self._version = version
+            verdict = self._verdicts.get(key)
+            if verdict is not None:
+                self._verdicts.move_to_end(key)
+                self.hits += 1
+                return verdict
+            self.misses += 1
+        verdict = compute()
+        with self._lock:
+            if version == self._version:
+                self._verdicts[key] = verdict
+                if len(self._verdicts) > self.maxsize:
+                    self._verdicts.popitem(last=False)
+        return verdict
+
+    def clear(self) -> None:
+        """Очистить кэш и счётчики."""
+        with self._lock:
+            self._verdicts.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> Dict[str, int]:
+        """Счётчики попаданий и промахов для подбора размера кэша."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self._verdicts),
+            'maxsize': self.maxsize,
+        }
+
+
+verdict_cache = TokenVerdictCache(settings.FORBIDDEN_VERDICT_CACHE_SIZE)
@@ -1,17 +1,47 @@
+from typing import Dict
+
 from django.core.exceptions import ValidationError
 from django.conf import settings
 
-from .utils import is_forbidden, get_forbidden_words
+from .dictionary import get_forbidden_dictionary
+
+OBSCENITY_MESSAGE = (
+    "Использование запрещенных слов не допустимо. "
+    "Ну и ну вы разочаровали партию. "
+    "-10000 социального рейтинга."
+)
+
+
+def check_fields_for_obscenities(fields: Dict[str, str]) -> Dict[str, bool]:
+    """Пакетная проверка полей на обсценную/запрещённую лексику.
+
+    Args:
+        fields (Dict[str, str]): значения полей по их названиям.
+
+    Returns:
+        Dict[str, bool]: для каждого поля - найдены ли запрещённые слова.
+    """
+    dictionary = get_forbidden_dictionary()
+    return dictionary.check_fields(fields,
+                                   settings.THRESHOLD,
+                                   settings.FORBIDDEN_WORDS_MATCH_MODE)
+
+
+def validate_fields_no_obscenities(fields: Dict[str, str]):
+    """Кастомный валидатор нескольких полей за один проход по словарю."""
+    verdicts = check_fields_for_obscenities(fields)
+    errors = {
+        field: OBSCENITY_MESSAGE
+        for field, is_forbidden in verdicts.items() if is_forbidden
+    }
+    if errors:
+        raise ValidationError(errors)
+    return fields
 
 
 def validate_no_obscenities(value):
     """Кастомный валидатор наличие обсценной/запрещённой лексики."""
 
-    forbidden_words = get_forbidden_words()
-    if is_forbidden(value.lower(), forbidden_words, settings.THRESHOLD):
-        raise ValidationError(
-            "Использование запрещенных слов не допустимо. "
-            "Ну и ну вы разочаровали партию. "
-            "-10000 социального рейтинга."
-        )
+    if check_fields_for_obscenities({'value': value})['value']:
+        raise ValidationError(OBSCENITY_MESSAGE)
     return value
@@ -48,11 +48,13 @@ class RecipeAdmin(admin.ModelAdmin):
         'get_favourites',
         'show_tags',
         'pub_date',
+        'moderation_status',
     )
     list_filter: tuple = (
         'author',
         'name',
         'tags',
+        'moderation_status',
     )
     search_fields: tuple = (
         'name',
@@ -75,6 +77,23 @@ class RecipeAdmin(admin.ModelAdmin):
         'Cписок тегов'
     )
 
+    def save_related(self, request, form, formsets, change):
+        """Пересчёт отпечатка после сохранения тегов и ингредиентов.
+
+        Если у автора уже есть рецепт с тем же содержимым,
+        отпечаток остаётся пустым.
+        """
+        super().save_related(request, form, formsets, change)
+        recipe = form.instance
+        fingerprint = recipe.get_fingerprint()
+        if Recipe.objects.filter(
+            author=recipe.author_id, fingerprint=fingerprint
+        ).exclude(pk=recipe.pk).exists():
+            fingerprint = None
+        if recipe.fingerprint != fingerprint:
+            recipe.fingerprint = fingerprint
+            recipe.save(update_fields=('fingerprint',))
+
 
 class IngredientAdmin(admin.ModelAdmin):
     """ Интерфейс администратора для списка ингредиентов. """
@@ -0,0 +1,184 @@
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.utils import timezone
+from PIL import Image
+
+from core.cache import bump_table_versions, invalidate_recipe_fragments
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'recipes/renditions/'
+PROCESSING_FIELDS = ('pk', 'image', 'processed_image', 'image_renditions')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Пул потоков обработки картинок, один на процесс."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.RECIPE_IMAGE_WORKERS,
+                    thread_name_prefix='recipe-images',
+                )
+    return _executor
+
+
+def encode(image: Image.Image, image_format: str) -> bytes:
+    """Картинка, закодированная в image_format."""
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def resize(image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+    """Копия картинки, вписанная в size."""
+    resized = image.copy()
+    resized.thumbnail(size)
+    return resized
+
+
+def save_renditions(recipe, image: Image.Image,
+                    processed: Image.Image) -> Dict[str, dict]:
+    """Сохранить варианты картинки из RECIPE_IMAGE_RENDITIONS.
+
+    Каждый размер сохраняется в исходном формате и в WebP
+    в recipes/renditions/ рядом с исходной картинкой. Для размера
+    RECIPE_IMAGE_SIZE в исходном формате берётся уже сохранённая
+    processed_image.
+
+    Returns:
+        Dict[str, dict]: имя варианта - размеры и пути файлов
+            в хранилище.
+    """
+    storage = recipe.image.storage
+    stem = Path(recipe.image.name).stem
+    extension = Path(recipe.image.name).suffix
+    renditions = {}
+    for name, size in settings.RECIPE_IMAGE_RENDITIONS.items():
+        base = f'{RENDITIONS_DIR}{stem}_{name}'
+        if tuple(size) == tuple(settings.RECIPE_IMAGE_SIZE):
+            resized = processed
+            src = recipe.processed_image.name
+        else:
+            resized = resize(image, size)
+            src = storage.save(f'{base}{extension}', ContentFile(
+                encode(resized, image.format)
+            ))
+        renditions[name] = {
+            'width': resized.width,
+            'height': resized.height,
+            'src': src,
+            'webp': storage.save(f'{base}.webp', ContentFile(
+                encode(resized, 'WEBP')
+            )),
+        }
+    return renditions
+
+
+def rendition_files(renditions: Dict[str, dict]) -> Iterator[str]:
+    """Пути всех файлов вариантов картинки в хранилище.
+
+    Среди них может быть и processed_image.
+    """
+    for rendition in renditions.values():
+        yield rendition['src']
+        yield rendition['webp']
+
+
+def rendition_urls(storage, renditions: Dict[str, dict]) -> Dict[str, dict]:
+    """Варианты картинки с адресами файлов вместо путей."""
+    return {
+        name: {
+            'width': rendition['width'],
+            'height': rendition['height'],
+            'url': storage.url(rendition['src']),
+            'webp': storage.url(rendition['webp']),
+        }
+        for name, rendition in renditions.items()
+    }
+
+
+def process_image(recipe) -> bool:
+    """Сохранить обработанную картинку рецепта и её варианты.
+
+    Исходный файл декодируется один раз. Рецепт обновляется,
+    только если его картинка не сменилась за время обработки,
+    иначе готовые файлы удаляются. Файлы прошлой обработки
+    удаляются после обновления.
+
+    Args:
+        recipe (Recipe): рецепт с загруженной картинкой
+
+    Returns:
+        bool: обработанная картинка сохранена.
+    """
+    original = recipe.image.name
+    previous = [recipe.processed_image.name,
+                *rendition_files(recipe.image_renditions)]
+    with recipe.image.open('rb') as file:
+        image = Image.open(file)
+        image.load()
+    processed = resize(image, settings.RECIPE_IMAGE_SIZE)
+    recipe.processed_image.save(
+        Path(original).name,
+        ContentFile(encode(processed, image.format)),
+        save=False,
+    )
+    renditions = save_renditions(recipe, image, processed)
+    updated = type(recipe).objects.filter(
+        pk=recipe.pk, image=original
+    ).update(processed_image=recipe.processed_image.name,
+             image_renditions=renditions,
+             updated_at=timezone.now())
+    if not updated:
+        recipe.processed_image.delete(save=False)
+        for name in rendition_files(renditions):
+            recipe.image.storage.delete(name)
+        return False
+    for name in previous:
+        if name and name != original:
+            recipe.image.storage.delete(name)
+    invalidate_recipe_fragments((recipe.pk,))
+    bump_table_versions((recipe._meta.db_table,))
+    return True
+
+
+def process_image_by_pk(model, pk: int) -> None:
+    """Обработать картинку рецепта в потоке пула."""
+    try:
+        recipe = model.objects.only(*PROCESSING_FIELDS).get(pk=pk)
+        process_image(recipe)
+    except model.DoesNotExist:
+        pass
+    except Exception:
+        logger.exception('Не удалось обработать картинку рецепта %s', pk)
+    finally:
+        connections.close_all()
+
+
+def schedule_image_processing(model, pk: int) -> None:
+    """Поставить обработку картинки рецепта в пул.
+
+    Вызывается после фиксации транзакции. Без пула
+    (RECIPE_IMAGE_WORKERS = 0) картинка обрабатывается сразу.
+    """
+    if settings.RECIPE_IMAGE_WORKERS:
+        get_executor().submit(process_image_by_pk, model, pk)
+    else:
+        recipe = model.objects.only(*PROCESSING_FIELDS).filter(
+            pk=pk
+        ).first()
+        if recipe is not None:
+            process_image(recipe)
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.6 on 2026-10-18 03:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='moderation_status',
+            field=models.CharField(choices=[('pending', 'На модерации'), ('approved', 'Опубликован'), ('rejected', 'Отклонён')], db_index=True, default='approved', max_length=20, verbose_name='Статус модерации'),
+        ),
+    ]
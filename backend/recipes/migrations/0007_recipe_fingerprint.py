@@ -0,0 +1,67 @@
+# Generated by Django 4.2.6 on 2026-10-18 04:03
+
+import hashlib
+import json
+
+from django.db import migrations, models
+
+
+def normalize_text(value):
+    return ' '.join(value.casefold().split())
+
+
+def recipe_fingerprint(name, text, cooking_time, ingredients, tags):
+    """Копия recipes.models.recipe_fingerprint на момент миграции."""
+    content = json.dumps((
+        normalize_text(name),
+        normalize_text(text),
+        int(cooking_time),
+        sorted((int(id), int(amount)) for id, amount in ingredients),
+        sorted(int(id) for id in tags),
+    ), ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def fill_fingerprints(apps, schema_editor):
+    """Отпечатки существующих рецептов.
+
+    У повторных копий одного рецепта автора отпечаток остаётся пустым,
+    чтобы не нарушить уникальность.
+    """
+    Recipe = apps.get_model('recipes', 'Recipe')
+    seen = set()
+    changed = []
+    recipes = Recipe.objects.prefetch_related('tags', 'ingredient_quantity')
+    for recipe in recipes.order_by('id').iterator(chunk_size=500):
+        fingerprint = recipe_fingerprint(
+            recipe.name, recipe.text, recipe.cooking_time,
+            ((quantity.ingredients_id, quantity.amount)
+             for quantity in recipe.ingredient_quantity.all()),
+            (tag.id for tag in recipe.tags.all()),
+        )
+        if (recipe.author_id, fingerprint) in seen:
+            continue
+        seen.add((recipe.author_id, fingerprint))
+        recipe.fingerprint = fingerprint
+        changed.append(recipe)
+    Recipe.objects.bulk_update(changed, ('fingerprint',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0006_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='Отпечаток содержимого'),
+        ),
+        migrations.RunPython(fill_fingerprints, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='recipe',
+            constraint=models.UniqueConstraint(fields=('author', 'fingerprint'), name='unique_recipe_fingerprint'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.6 on 2026-10-18 04:06
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def mark_processed(apps, schema_editor):
+    """Картинки существующих рецептов уже уменьшены при сохранении."""
+    Recipe = apps.get_model('recipes', 'Recipe')
+    Recipe.objects.exclude(image='').update(processed_image=F('image'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0007_recipe_fingerprint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='processed_image',
+            field=models.ImageField(blank=True, editable=False, upload_to='recipes/processed/', verbose_name='Обработанная картинка'),
+        ),
+        migrations.RunPython(mark_processed, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,15 @@
-from django.db import models
+import hashlib
+import json
+from typing import Iterable, Tuple
+
+from django.db import models, transaction
 from django.conf import settings
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from colorfield.fields import ColorField
-from PIL import Image
+
+from recipes.images import (rendition_files, rendition_urls,
+                            schedule_image_processing)
 
 
 class Tag(models.Model):
@@ -86,6 +92,79 @@ class Ingredient(models.Model):
         return super().clean(*args, **kwargs)
 
 
+def normalize_text(value: str) -> str:
+    """Текст без различий в регистре и пробелах."""
+    return ' '.join(value.casefold().split())
+
+
+def recipe_fingerprint(name: str, text: str, cooking_time: int,
+                       ingredients: Iterable[Tuple[int, int]],
+                       tags: Iterable[int]) -> str:
+    """Отпечаток содержимого рецепта для поиска дубликатов.
+
+    Args:
+        name (str): название рецепта
+        text (str): описание рецепта
+        cooking_time (int): время приготовления
+        ingredients (Iterable[Tuple[int, int]]): пары id ингредиента
+            и количество
+        tags (Iterable[int]): id тегов
+
+    Returns:
+        str: sha256 в hex.
+    """
+    content = json.dumps((
+        normalize_text(name),
+        normalize_text(text),
+        int(cooking_time),
+        sorted((int(id), int(amount)) for id, amount in ingredients),
+        sorted(int(id) for id in tags),
+    ), ensure_ascii=False)
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+class RecipeQuerySet(models.QuerySet):
+    """QuerySet рецептов."""
+
+    def approved(self):
+        """Рецепты, прошедшие модерацию."""
+        return self.filter(moderation_status=Recipe.ModerationStatus.APPROVED)
+
+    def for_read(self):
+        """Рецепты со всем, что нужно для их отображения.
+
+        Автор присоединяется в основном запросе, теги и количества
+        ингредиентов вместе с самими ингредиентами загружаются
+        двумя запросами на всю выборку.
+        """
+        return self.select_related('author').prefetch_related(
+            'tags',
+            models.Prefetch(
+                'ingredient_quantity',
+                queryset=IngredientQuantity.objects.select_related(
+                    'ingredients'
+                ),
+            ),
+        )
+
+    def annotate_user_flags(self, user):
+        """Отметки избранного и списка покупок пользователя в том же запросе.
+
+        Для анонимного пользователя отметки - константа False.
+        """
+        if user.is_anonymous:
+            return self.annotate(is_favorited=models.Value(False),
+                                 is_in_shopping_cart=models.Value(False))
+        return self.annotate(
+            is_favorited=models.Exists(Favourites.objects.filter(
+                user=user, recipe=models.OuterRef('pk')
+            )),
+            is_in_shopping_cart=models.Exists(Shopping.objects.filter(
+                user=user, recipe=models.OuterRef('pk')
+            )),
+        )
+
+
 class Recipe(models.Model):
     """Модель для рецептов.
 
@@ -93,13 +172,25 @@ class Recipe(models.Model):
         author (ForeignKey[User]): автор рецепта
         name (CharField[User]): название рецепта
         image (ImageField): картинка рецепта
+        processed_image (ImageField): уменьшенная картинка рецепта
+        image_renditions (JSONField[dict]): размеры и файлы вариантов картинки
         text (TextField[str]): текстовое описание
         ingredients (ForeignKey[IngredientQuantity]): продукты для рецепту
         tags (ForeignKey[Tag]): тег
         cooking_time (PositiveSmallIntegerField[int]): время приготовления
         pub_date (DateTimeField[datetime]): время публикации
+        updated_at (DateTimeField[datetime]): время последнего изменения
+        fingerprint (CharField[str]): отпечаток содержимого рецепта
+        moderation_status (CharField[str]): статус модерации текста
     """
 
+    class ModerationStatus(models.TextChoices):
+        """Статусы модерации текста рецепта."""
+
+        PENDING = 'pending', 'На модерации'
+        APPROVED = 'approved', 'Опубликован'
+        REJECTED = 'rejected', 'Отклонён'
+
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -114,6 +205,18 @@ class Recipe(models.Model):
         'Картинка',
         upload_to='recipes/',
     )
+    processed_image = models.ImageField(
+        'Обработанная картинка',
+        upload_to='recipes/processed/',
+        blank=True,
+        editable=False,
+    )
+    image_renditions = models.JSONField(
+        'Варианты картинки',
+        default=dict,
+        blank=True,
+        editable=False,
+    )
     text = models.TextField(
         'Текст',
         help_text='Введите текст рецепта',
@@ -148,20 +251,91 @@ class Recipe(models.Model):
         auto_now_add=True,
         db_index=True,
     )
+    updated_at = models.DateTimeField(
+        'Время изменения',
+        auto_now=True,
+    )
+    fingerprint = models.CharField(
+        'Отпечаток содержимого',
+        max_length=settings.FINGERPRINT_MAX_LENGTH,
+        null=True,
+        blank=True,
+        editable=False,
+    )
+    moderation_status = models.CharField(
+        'Статус модерации',
+        max_length=settings.MODERATION_STATUS_MAX_LENGTH,
+        choices=ModerationStatus.choices,
+        default=ModerationStatus.APPROVED,
+        db_index=True,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = (
+            models.Index(
+                name='recipe_pub_date_id_idx',
+                fields=('-pub_date', '-id'),
+            ),
+        )
+        constraints = (
+            models.UniqueConstraint(
+                name='unique_recipe_fingerprint',
+                fields=('author', 'fingerprint'),
+            ),
+        )
 
     def __str__(self) -> str:
         return self.name
 
+    def get_fingerprint(self) -> str:
+        """Отпечаток рецепта по его сохранённым тегам и ингредиентам."""
+        return recipe_fingerprint(
+            self.name, self.text, self.cooking_time,
+            self.ingredient_quantity.values_list('ingredients_id', 'amount'),
+            self.tags.values_list('id', flat=True),
+        )
+
+    @property
+    def display_image(self):
+        """Обработанная картинка, а пока её нет - исходная."""
+        return self.processed_image or self.image
+
+    @property
+    def image_rendition_urls(self) -> dict:
+        """Варианты картинки с адресами, пока их нет - пустой словарь."""
+        return rendition_urls(self.image.storage, self.image_renditions)
+
     def save(self, *args, **kwargs) -> None:
+        """Сохранение рецепта.
+
+        Новая картинка обрабатывается после фиксации транзакции
+        в пуле recipes.images, до этого отдаётся исходная.
+        Сохранение без смены картинки её не трогает.
+        """
+        image_changed = bool(self.image) and not self.image._committed
+        stale = []
+        if image_changed:
+            stale = list(rendition_files(self.image_renditions))
+            if self.processed_image:
+                stale.append(self.processed_image.name)
+            self.processed_image = ''
+            self.image_renditions = {}
         super().save(*args, **kwargs)
-        image = Image.open(self.image.path)
-        image.thumbnail(settings.RECIPE_IMAGE_SIZE)
-        image.save(self.image.path)
+        if not image_changed:
+            return
+        storage, model, pk = self.processed_image.storage, type(self), self.pk
+
+        def on_commit() -> None:
+            for name in stale:
+                storage.delete(name)
+            schedule_image_processing(model, pk)
+
+        transaction.on_commit(on_commit)
 
 
 class IngredientQuantity(models.Model):